@@ -0,0 +1,378 @@
+# This file benchmarks the pipeline offline against the local stub servers of stub_servers.py.
+# It runs processing_pipeline (src/blog_automation.py), process_url_with_julep and
+# fetch_content_with_jina (julep_jina.py), scrape_urls and clean_html under load, and reports
+# p50/p95/p99 latency, throughput and API calls per scenario; the startup scenario times cold
+# imports and the first request of each script in fresh interpreters. Results are written as
+# JSON so runs can be compared across changes (--compare BASELINE.json).
+#
+#   python benchmarks/run_benchmarks.py --topics 20 --concurrency 4 --julep-latency 0.02
+#
+# Note: the Julep stub runs the fetch_web_content tool server-side, because the SDK has no
+# endpoint for submitting client-side tool outputs; process_url_with_julep therefore never
+# sees a requires_action status here.
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "src")]
+
+from stub_servers import LatencyModel, start_stubs, stop_stubs  # noqa: E402
+from blog_automation import percentile  # noqa: E402
+from tools.tracing import tracer  # noqa: E402
+
+SCENARIOS = ("pipeline", "julep_jina", "jina_fetch", "scrape", "clean", "startup")
+
+# Code run in a fresh interpreter per startup sample: import the module, then send its
+# first Julep request (a "not found" answer counts, only the round trip matters)
+STARTUP_PROBE = """
+import asyncio, json, os, time
+start = time.perf_counter()
+import {module} as m
+imported = time.perf_counter()
+try:
+    {request}
+except Exception:
+    pass
+print(json.dumps({{"import": imported - start, "first_request": time.perf_counter() - start}}))
+"""
+STARTUP_REQUESTS = {
+    "julep_jina": "m.get_client().agents.get(m.AGENT_UUID)",
+    "jina_ai": "m.get_client().agents.get(m.AGENT_UUID)",
+    "working_example": "m.get_client().agents.get(m.AGENT_UUID)",
+    "blog_automation": "asyncio.run(m.BlogAutomation().client.agents.get(os.environ['AGENT_UUID']))",
+}
+
+
+def summarize(latencies: List[float], wall_time: float, items: int, errors: int,
+              api_calls: Dict[str, Any]) -> Dict[str, Any]:
+    """Latency percentiles (seconds), throughput (items/sec) and API call counts of a scenario."""
+    return {
+        "operations": len(latencies),
+        "items": items,
+        "errors": errors,
+        "wall_time": round(wall_time, 4),
+        "throughput": round(items / wall_time, 3) if wall_time else None,
+        "latency": {
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "mean": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+            "max": round(max(latencies), 4) if latencies else 0.0,
+        },
+        "api_calls": api_calls,
+    }
+
+
+def stub_calls(stubs) -> Dict[str, Any]:
+    return {name: stub.stats() for name, stub in stubs.items()}
+
+
+def reset_stubs(stubs):
+    for stub in stubs.values():
+        stub.reset_counters()
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool):
+    """Silences the chatty status prints of the scripts under test."""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def run_threaded(func: Callable[[str], Any], items: List[str], concurrency: int):
+    """Calls func on every item from a thread pool; returns (latencies, errors, wall_time)."""
+    def timed(item):
+        start = time.perf_counter()
+        try:
+            func(item)
+            ok = True
+        except Exception as e:
+            logging.debug(f"{item} failed: {e}")
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(timed, items))
+    wall_time = time.perf_counter() - start
+    return [latency for latency, _ in outcomes], sum(not ok for _, ok in outcomes), wall_time
+
+
+def bench_pipeline(args, stubs, workdir: Path) -> Dict[str, Any]:
+    from blog_automation import BlogAutomation, DEFAULT_SOURCES
+    from tools.task_registry import TaskRegistry
+
+    with quiet(not args.verbose):
+        automation = BlogAutomation(max_connections=max(20, args.concurrency * 4))
+    if not str(automation.client.base_url).startswith(stubs["julep"].url):
+        raise RuntimeError(f"Julep client points at {automation.client.base_url}, not the stub server")
+    # Keep the benchmark's task hashes out of the project's registry file
+    automation.registry = TaskRegistry(automation.client, automation.agent_id, workdir / "task_registry.json")
+
+    topics = [f"benchmark topic {i}" for i in range(args.topics)]
+
+    async def run():
+        with quiet(not args.verbose):
+            await automation.prepare()
+            reset_stubs(stubs)
+            calls_before = automation.watcher.api_calls
+            start = time.perf_counter()
+            records = await automation.run_batch(topics, workdir / "blogs", DEFAULT_SOURCES, args.concurrency)
+            wall_time = time.perf_counter() - start
+        return records, wall_time, automation.watcher.api_calls - calls_before
+
+    records, wall_time, watcher_calls = asyncio.run(run())
+    api_calls = stub_calls(stubs)
+    api_calls["watcher"] = watcher_calls
+    return summarize(
+        [r["latency"] for r in records], wall_time, len(records), sum(not r["ok"] for r in records), api_calls
+    )
+
+
+def _import_julep_jina():
+    with quiet(True):
+        import julep_jina
+    logging.getLogger().setLevel(logging.WARNING)
+    return julep_jina
+
+
+def bench_julep_jina(args, stubs, workdir: Path) -> Dict[str, Any]:
+    julep_jina = _import_julep_jina()
+    julep_jina.create_julep_agent()
+    julep_jina.create_julep_task()
+
+    urls = [f"https://news.example.com/article/{i}" for i in range(args.urls)]
+    reset_stubs(stubs)
+    calls_before = julep_jina.watcher.api_calls
+    latencies, errors, wall_time = run_threaded(julep_jina.process_url_with_julep, urls, args.concurrency)
+    api_calls = stub_calls(stubs)
+    api_calls["watcher"] = julep_jina.watcher.api_calls - calls_before
+    return summarize(latencies, wall_time, len(urls), errors, api_calls)
+
+
+def bench_jina_fetch(args, stubs, workdir: Path) -> Dict[str, Any]:
+    julep_jina = _import_julep_jina()
+    urls = [f"https://blog.example.com/post/{i}" for i in range(args.urls)]
+    reset_stubs(stubs)
+    latencies, errors, wall_time = run_threaded(julep_jina.fetch_content_with_jina, urls, args.concurrency)
+    return summarize(latencies, wall_time, len(urls), errors, stub_calls(stubs))
+
+
+def _page_urls(stubs, count: int) -> List[str]:
+    return [f"{stubs['web'].url}/page/{i}" for i in range(count)]
+
+
+def bench_scrape(args, stubs, workdir: Path) -> Dict[str, Any]:
+    from tools.web_scraper import scrape_urls
+
+    reset_stubs(stubs)
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        urls = _page_urls(stubs, args.pages)
+        round_start = time.perf_counter()
+        with contextlib.redirect_stderr(io.StringIO()):
+            pages = asyncio.run(scrape_urls(urls, max_concurrent=args.concurrency, per_host=args.concurrency))
+        latencies.append(time.perf_counter() - round_start)
+        errors += sum(1 for page in pages if page["error"])
+    wall_time = time.perf_counter() - start
+    return summarize(latencies, wall_time, args.rounds * args.pages, errors, stub_calls(stubs))
+
+
+def bench_clean(args, stubs, workdir: Path) -> Dict[str, Any]:
+    from tools.content_cleaner import clean_html
+    from tools.web_scraper import scrape_urls
+
+    with contextlib.redirect_stderr(io.StringIO()):
+        pages = asyncio.run(scrape_urls(_page_urls(stubs, args.pages), max_concurrent=8, per_host=8))
+    pages = [page for page in pages if page["html_content"]]
+
+    results = {}
+    for mode in ("text", "main"):
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            round_start = time.perf_counter()
+            clean_html(pages, workers=args.workers, mode=mode)
+            latencies.append(time.perf_counter() - round_start)
+        wall_time = time.perf_counter() - start
+        results[mode] = summarize(latencies, wall_time, args.rounds * len(pages), 0, {})
+    return results
+
+
+def bench_startup(args, stubs, workdir: Path) -> Dict[str, Any]:
+    """
+    Cold-start cost of each script: module import time, time to the first Julep response
+    (both measured inside the child) and whole-process wall time including interpreter start.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(ROOT), str(ROOT / "src")]))
+    results = {}
+    for module, request in STARTUP_REQUESTS.items():
+        samples = {"import": [], "first_request": [], "process": []}
+        code = STARTUP_PROBE.format(module=module, request=request)
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            child = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env,
+                                   capture_output=True, text=True, check=True)
+            samples["process"].append(time.perf_counter() - start)
+            timings = json.loads(child.stdout.strip().splitlines()[-1])
+            samples["import"].append(timings["import"])
+            samples["first_request"].append(timings["first_request"])
+        results[module] = {
+            name: summarize(latencies, sum(latencies), len(latencies), 0, {})
+            for name, latencies in samples.items()
+        }
+    return results
+
+
+BENCHMARKS = {
+    "pipeline": bench_pipeline,
+    "julep_jina": bench_julep_jina,
+    "jina_fetch": bench_jina_fetch,
+    "scrape": bench_scrape,
+    "clean": bench_clean,
+    "startup": bench_startup,
+}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def configure_environment(stubs, workdir: Path):
+    """Points every client at the stubs and keeps caches in the scratch directory."""
+    os.environ.update({
+        "JULEP_BASE_URL": stubs["julep"].url,
+        "JINA_READER_URL": stubs["web"].url,
+        "JULEP_API_KEY": "benchmark",
+        "JINA_API_KEY": "benchmark",
+        "BRAVE_API_KEY": "benchmark",
+        "SERPER_API_KEY": "benchmark",
+        # A fresh agent per run, so every task is uploaded to the (empty) stub
+        "AGENT_UUID": str(uuid.uuid4()),
+        # Measure the uncached path
+        "SERPER_CACHE_TTL": "0",
+        "SERPER_CACHE_PATH": str(workdir / "serper_cache.sqlite3"),
+        "JINA_CACHE_TTL": "0",
+        "JINA_CACHE_PATH": str(workdir / "jina_cache.sqlite3"),
+        "TASK_DEFS_CACHE_PATH": str(workdir / "task_defs.json"),
+    })
+
+
+def print_report(results: Dict[str, Any], baseline: Dict[str, Any] = None):
+    def rows(scenarios, prefix=""):
+        for name, result in scenarios.items():
+            if "latency" in result:
+                yield prefix + name, result
+            else:
+                yield from rows(result, prefix + name + ".")
+
+    baseline_rows = dict(rows(baseline["scenarios"])) if baseline else {}
+    width = max([16] + [len(name) for name, _ in rows(results["scenarios"])])
+    print(f"{'scenario':{width}s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'items/s':>9s} {'errors':>6s} {'api calls':>9s}")
+    for name, result in rows(results["scenarios"]):
+        latency = result["latency"]
+        calls = sum(stats.get("total", 0) for stats in result["api_calls"].values() if isinstance(stats, dict))
+        line = (f"{name:{width}s} {latency['p50']:8.3f} {latency['p95']:8.3f} {latency['p99']:8.3f} "
+                f"{result['throughput'] or 0:9.2f} {result['errors']:6d} {calls:9d}")
+        previous = baseline_rows.get(name)
+        if previous and previous["latency"]["p50"]:
+            change = 100 * (latency["p50"] - previous["latency"]["p50"]) / previous["latency"]["p50"]
+            line += f"   p50 {change:+.1f}% vs baseline"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks against local stub servers")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS),
+                        help="Scenarios to run (default: all)")
+    parser.add_argument("--topics", type=int, default=10, help="Topics run through processing_pipeline")
+    parser.add_argument("--urls", type=int, default=20, help="URLs processed by the julep_jina scenarios")
+    parser.add_argument("--pages", type=int, default=50, help="Pages per scrape/clean round")
+    parser.add_argument("--rounds", type=int, default=5, help="Repetitions of the scrape/clean batches and startup samples")
+    parser.add_argument("--concurrency", type=int, default=4, help="Topics/URLs/requests in flight")
+    parser.add_argument("--workers", type=int, default=None, help="Processes used by clean_html")
+    parser.add_argument("--julep-latency", type=float, default=0.02, help="Median Julep API response time (s)")
+    parser.add_argument("--execution-latency", type=float, default=0.3, help="Median execution run time (s)")
+    parser.add_argument("--serper-latency", type=float, default=0.1, help="Median Serper response time (s)")
+    parser.add_argument("--web-latency", type=float, default=0.05, help="Median Jina/page response time (s)")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Log-normal spread of all latencies")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of stub responses that fail with 500")
+    parser.add_argument("--execution-failure-rate", type=float, default=0.0, help="Share of executions that fail")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the latency/error generators")
+    parser.add_argument("--output", default=None,
+                        help="Result file (default: benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Earlier result file to compare p50 latencies with")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the code under test")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Also record spans and write them to FILE (.jsonl or Chrome trace format)")
+    args = parser.parse_args()
+    if args.trace:
+        tracer.enable()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    latencies = {
+        "julep": LatencyModel(args.julep_latency, args.sigma, args.error_rate, seed=args.seed),
+        "execution": LatencyModel(args.execution_latency, args.sigma, args.execution_failure_rate, seed=args.seed + 1),
+        "serper": LatencyModel(args.serper_latency, args.sigma, args.error_rate, seed=args.seed + 2),
+        "web": LatencyModel(args.web_latency, args.sigma, args.error_rate, seed=args.seed + 3),
+    }
+    stubs = start_stubs(latencies["julep"], latencies["execution"], latencies["serper"], latencies["web"])
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": {
+            "scenarios": args.scenarios, "topics": args.topics, "urls": args.urls, "pages": args.pages,
+            "rounds": args.rounds, "concurrency": args.concurrency, "workers": args.workers,
+            "latency": {name: model.to_dict() for name, model in latencies.items()},
+        },
+        "scenarios": {},
+    }
+    try:
+        with tempfile.TemporaryDirectory(prefix="blog-bench-") as workdir:
+            configure_environment(stubs, Path(workdir))
+            for name in args.scenarios:
+                print(f"Running {name}...", file=sys.stderr)
+                results["scenarios"][name] = BENCHMARKS[name](args, stubs, Path(workdir))
+    finally:
+        stop_stubs(stubs)
+
+    output = Path(args.output) if args.output else ROOT / "benchmarks" / "results" / f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+    print_report(results, baseline)
+    print(f"Results written to {output}", file=sys.stderr)
+    if args.trace:
+        print(f"Wrote {tracer.export(args.trace)} spans to {args.trace}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
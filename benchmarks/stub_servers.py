@@ -0,0 +1,490 @@
+# This file defines local stand-ins for the services the pipeline talks to, so it can be
+# benchmarked offline: the Julep REST API (agents, tasks, executions, transitions), the
+# Serper search/images endpoints and the Jina Reader (which also serves plain HTML pages).
+# Every stub runs a threaded HTTP server in a daemon thread, delays each response
+# according to a latency model, injects errors at a configurable rate and counts calls
+# per route.
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+
+class LatencyModel:
+    def __init__(self, median: float = 0.02, sigma: float = 0.5, error_rate: float = 0.0, seed: Optional[int] = None):
+        """
+        Log-normal response times with random failures.
+
+        Args:
+            median: Median delay in seconds (0 disables the delay).
+            sigma: Spread of the log-normal distribution; larger values give a longer tail.
+            error_rate: Probability that a response is replaced by an HTTP 500.
+            seed: Seed of the random generator, for reproducible runs.
+        """
+        self.median = median
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        with self._lock:
+            return self.median * self._rng.lognormvariate(0, self.sigma)
+
+    def fails(self) -> bool:
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"median": self.median, "sigma": self.sigma, "error_rate": self.error_rate}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class StubServer:
+    """Base class: routes requests to handler methods and records call counts."""
+
+    # (method, compiled path pattern, route name, handler method name)
+    routes = ()
+
+    def __init__(self, latency: Optional[LatencyModel] = None):
+        self.latency = latency or LatencyModel()
+        self.calls: Dict[str, int] = {}
+        self.errors_injected = 0
+        self._counter_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub._dispatch(self, "GET")
+
+            def do_POST(self):
+                stub._dispatch(self, "POST")
+
+            def do_PUT(self):
+                stub._dispatch(self, "PUT")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name=type(self).__name__, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def reset_counters(self):
+        with self._counter_lock:
+            self.calls = {}
+            self.errors_injected = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            return {"calls": dict(self.calls), "total": sum(self.calls.values()), "errors_injected": self.errors_injected}
+
+    def _count(self, route: str, error: bool = False):
+        with self._counter_lock:
+            self.calls[route] = self.calls.get(route, 0) + 1
+            self.errors_injected += error
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler, method: str):
+        parts = urlsplit(handler.path)
+        length = int(handler.headers.get("Content-Length") or 0)
+        raw = handler.rfile.read(length) if length else b""
+        body = None
+        if raw:
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                body = raw.decode("utf-8", "replace")
+
+        for route_method, pattern, name, attr in self.routes:
+            match = pattern.fullmatch(parts.path)
+            if route_method == method and match:
+                break
+        else:
+            self._count(f"{method} <unknown>")
+            return self._send(handler, 404, {"detail": f"No route for {method} {parts.path}"})
+
+        failed = self.latency.fails()
+        self._count(name, error=failed)
+        time.sleep(self.latency.delay())
+        if failed:
+            return self._send(handler, 500, {"detail": "Injected error"})
+
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        try:
+            status, payload, content_type = getattr(self, attr)(match, query, body)
+        except Exception as e:
+            status, payload, content_type = 500, {"detail": str(e)}, "application/json"
+        self._send(handler, status, payload, content_type)
+
+    @staticmethod
+    def _send(handler: BaseHTTPRequestHandler, status: int, payload: Any, content_type: str = "application/json"):
+        if isinstance(payload, (bytes, str)):
+            data = payload.encode("utf-8") if isinstance(payload, str) else payload
+        else:
+            data = json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def _route(method: str, pattern: str, name: str, attr: str) -> Tuple[str, "re.Pattern", str, str]:
+    return method, re.compile(pattern), name, attr
+
+
+_WORDS = (
+    "model research agents benchmark language reasoning open source training data release "
+    "inference safety evaluation hardware robotics vision speech policy startup funding"
+).split()
+
+
+def _sentence(rng: random.Random, words: int = 16) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+class SerperStub(StubServer):
+    """Stand-in for google.serper.dev; answers /search and /images for any query."""
+
+    routes = (
+        _route("POST", r"/search", "POST /search", "search"),
+        _route("POST", r"/images", "POST /images", "images"),
+    )
+
+    def __init__(self, latency: Optional[LatencyModel] = None, results: int = 10, duplicate_rate: float = 0.2):
+        """
+        Args:
+            latency: Response time and error model.
+            results: Organic results (and images) returned per query.
+            duplicate_rate: Share of organic results that repeat an earlier snippet, as
+                syndicated stories do.
+        """
+        super().__init__(latency)
+        self.results = results
+        self.duplicate_rate = duplicate_rate
+
+    def search(self, match, query, body):
+        q = (body or {}).get("q", "") if isinstance(body, dict) else ""
+        rng = random.Random(q)
+        organic = []
+        for position in range(1, self.results + 1):
+            if organic and rng.random() < self.duplicate_rate:
+                snippet = rng.choice(organic)["snippet"]
+            else:
+                snippet = " ".join(_sentence(rng) for _ in range(3))
+            organic.append({
+                "title": f"{q[:40]} - result {position}",
+                "link": f"https://www.example{position % 5}.com/story/{position}",
+                "snippet": snippet,
+                "position": position,
+            })
+        return 200, {"searchParameters": {"q": q}, "organic": organic}, "application/json"
+
+    def images(self, match, query, body):
+        q = (body or {}).get("q", "") if isinstance(body, dict) else ""
+        images = [
+            {
+                "title": f"{q[:40]} image {position}",
+                "imageUrl": f"https://images.example.com/{position}.jpg",
+                "imageWidth": 1200,
+                "imageHeight": 800,
+                "link": f"https://www.example.com/gallery/{position}",
+                "position": position,
+            }
+            for position in range(1, self.results + 1)
+        ]
+        return 200, {"searchParameters": {"q": q}, "images": images}, "application/json"
+
+
+def synthetic_html(seed: str, paragraphs: int = 40) -> str:
+    """An article-like page with navigation, sidebar and footer chrome."""
+    rng = random.Random(seed)
+    body = "".join(
+        f"<p>{' '.join(_sentence(rng) for _ in range(3))} <a href='/l{i}'>link</a></p>"
+        for i in range(paragraphs)
+    )
+    return (
+        f"<html><head><meta charset='utf-8'><title>{seed}</title><style>body{{color:#333}}</style>"
+        "<script>var tracking = true;</script></head><body>"
+        "<nav><a href='/'>Home</a> | <a href='/news'>News</a></nav>"
+        f"<div class='sidebar'><a href='/a'>Related</a><a href='/b'>Popular</a></div>"
+        f"<article><h1>{seed}</h1>{body}</article>"
+        "<footer>Copyright Example Media</footer></body></html>"
+    )
+
+
+class WebStub(StubServer):
+    """
+    Stand-in for r.jina.ai (GET /<url> returns the page as text) that also serves the
+    raw HTML pages under /page/<n> for the scraper benchmarks.
+    """
+
+    routes = (
+        _route("GET", r"/page/(?P<page>[^/]+)", "GET /page/{n}", "page"),
+        _route("GET", r"/(?P<target>.+)", "GET /{url}", "reader"),
+    )
+
+    def __init__(self, latency: Optional[LatencyModel] = None, paragraphs: int = 40):
+        super().__init__(latency)
+        self.paragraphs = paragraphs
+
+    def page(self, match, query, body):
+        return 200, synthetic_html(match.group("page"), self.paragraphs), "text/html; charset=utf-8"
+
+    def reader(self, match, query, body):
+        rng = random.Random(match.group("target"))
+        text = f"Title: {match.group('target')}\n\n" + "\n\n".join(
+            " ".join(_sentence(rng) for _ in range(4)) for _ in range(self.paragraphs)
+        )
+        return 200, text, "text/plain; charset=utf-8"
+
+
+class JulepStub(StubServer):
+    """
+    Stand-in for the Julep API. Executions run server-side on a timer: Serper api_call
+    tasks call the Serper stub, tasks using the fetch_web_content tool (or the Jina
+    integration) read from the web stub, and any other task "generates" a markdown post.
+    """
+
+    routes = (
+        _route("POST", r"/agents/(?P<agent_id>[^/]+)", "POST /agents/{id}", "upsert_agent"),
+        _route("GET", r"/agents/(?P<agent_id>[^/]+)", "GET /agents/{id}", "get_agent"),
+        _route("POST", r"/agents/(?P<agent_id>[^/]+)/tools", "POST /agents/{id}/tools", "create_tool"),
+        _route("POST", r"/agents/(?P<agent_id>[^/]+)/tasks/(?P<task_id>[^/]+)",
+               "POST /agents/{id}/tasks/{id}", "upsert_task"),
+        _route("GET", r"/tasks/(?P<task_id>[^/]+)", "GET /tasks/{id}", "get_task"),
+        _route("POST", r"/tasks/(?P<task_id>[^/]+)/executions", "POST /tasks/{id}/executions", "create_execution"),
+        _route("GET", r"/tasks/(?P<task_id>[^/]+)/executions", "GET /tasks/{id}/executions", "list_executions"),
+        _route("GET", r"/executions/(?P<execution_id>[^/]+)", "GET /executions/{id}", "get_execution"),
+        _route("GET", r"/executions/(?P<execution_id>[^/]+)/transitions",
+               "GET /executions/{id}/transitions", "list_transitions"),
+    )
+
+    def __init__(self, latency: Optional[LatencyModel] = None, execution_latency: Optional[LatencyModel] = None,
+                 serper_url: Optional[str] = None, reader_url: Optional[str] = None):
+        """
+        Args:
+            latency: Response time and error model of the API itself.
+            execution_latency: Server-side run time of an execution; its error rate is the
+                share of executions that fail.
+            serper_url: Base URL of the Serper stub used by api_call tasks.
+            reader_url: Base URL of the web stub used by reader tasks.
+        """
+        super().__init__(latency)
+        self.execution_latency = execution_latency or LatencyModel(median=0.2)
+        self.serper_url = serper_url
+        self.reader_url = reader_url
+        self._lock = threading.Lock()
+        self.agents: Dict[str, dict] = {}
+        self.tasks: Dict[str, dict] = {}
+        self.executions: Dict[str, dict] = {}
+        self.transitions: Dict[str, list] = {}
+
+    # Agents and tasks
+
+    def upsert_agent(self, match, query, body):
+        agent_id = match.group("agent_id")
+        with self._lock:
+            agent = self.agents.setdefault(agent_id, {"id": agent_id, "created_at": _now()})
+            agent.update(body or {}, updated_at=_now())
+            return 200, agent, "application/json"
+
+    def get_agent(self, match, query, body):
+        agent = self.agents.get(match.group("agent_id"))
+        if agent is None:
+            return 404, {"detail": "Agent not found"}, "application/json"
+        return 200, agent, "application/json"
+
+    def create_tool(self, match, query, body):
+        tool = dict(body or {}, id=str(uuid.uuid4()), created_at=_now(), updated_at=_now())
+        with self._lock:
+            agent = self.agents.setdefault(match.group("agent_id"), {"id": match.group("agent_id"), "created_at": _now()})
+            agent.setdefault("tools", []).append(tool)
+        return 201, tool, "application/json"
+
+    def upsert_task(self, match, query, body):
+        task_id = match.group("task_id")
+        task = dict(body or {}, id=task_id, agent_id=match.group("agent_id"), created_at=_now(), updated_at=_now())
+        task["kind"] = self._task_kind(task)
+        with self._lock:
+            self.tasks[task_id] = task
+        return 200, task, "application/json"
+
+    def get_task(self, match, query, body):
+        task = self.tasks.get(match.group("task_id"))
+        if task is None:
+            return 404, {"detail": "Task not found"}, "application/json"
+        return 200, task, "application/json"
+
+    @staticmethod
+    def _task_kind(task: dict) -> str:
+        for tool in task.get("tools") or []:
+            url = ((tool.get("api_call") or {}).get("url") or "")
+            if url.endswith("/search"):
+                return "serper_search"
+            if url.endswith("/images"):
+                return "serper_images"
+            if ((tool.get("integration") or {}).get("provider") or "").startswith("jina"):
+                return "reader"
+        for step in task.get("main") or []:
+            if isinstance(step, dict) and step.get("tool") == "fetch_web_content":
+                return "reader"
+        return "prompt"
+
+    # Executions
+
+    def create_execution(self, match, query, body):
+        task = self.tasks.get(match.group("task_id"))
+        if task is None:
+            return 404, {"detail": "Task not found"}, "application/json"
+        execution_id = str(uuid.uuid4())
+        execution = {
+            "id": execution_id,
+            "task_id": task["id"],
+            "input": (body or {}).get("input", {}),
+            "status": "queued",
+            "output": None,
+            "error": None,
+            "metadata": {},
+            "transition_count": 0,
+            "created_at": _now(),
+            "updated_at": _now(),
+        }
+        with self._lock:
+            self.executions[execution_id] = execution
+            self.transitions[execution_id] = []
+        timer = threading.Timer(self.execution_latency.delay(), self._run_execution, args=(execution_id, task))
+        timer.daemon = True
+        timer.start()
+        return 201, execution, "application/json"
+
+    def _add_transition(self, execution: dict, type_: str, output: Any, step: int):
+        transition = {
+            "id": str(uuid.uuid4()),
+            "execution_id": execution["id"],
+            "type": type_,
+            "current": {"workflow": "main", "step": step},
+            "next": None if type_ == "finish" else {"workflow": "main", "step": step + 1},
+            "output": output,
+            "created_at": _now(),
+            "updated_at": _now(),
+            "metadata": {},
+        }
+        self.transitions[execution["id"]].append(transition)
+        execution["transition_count"] += 1
+
+    def _run_execution(self, execution_id: str, task: dict):
+        with self._lock:
+            execution = self.executions[execution_id]
+            execution.update(status="running", updated_at=_now())
+            self._add_transition(execution, "init", execution["input"], 0)
+        try:
+            if self.execution_latency.fails():
+                raise RuntimeError("Injected execution failure")
+            output = self._execute(task["kind"], execution["input"])
+            status, error = "succeeded", None
+        except Exception as e:
+            output, status, error = None, "failed", str(e)
+        with self._lock:
+            if status == "succeeded":
+                self._add_transition(execution, "step", output, 0)
+                self._add_transition(execution, "finish", output, 1)
+            else:
+                self._add_transition(execution, "error", {"error": error}, 0)
+            execution.update(status=status, output=output, error=error, updated_at=_now())
+
+    def _execute(self, kind: str, task_input: dict) -> Any:
+        if kind in ("serper_search", "serper_images"):
+            endpoint = "search" if kind == "serper_search" else "images"
+            response = requests.post(f"{self.serper_url}/{endpoint}", json={"q": task_input.get("query", "")}, timeout=30)
+            response.raise_for_status()
+            return {"status_code": response.status_code, "json": response.json()}
+        if kind == "reader":
+            url = task_input.get("url", "")
+            response = requests.get(f"{self.reader_url}/{url}", timeout=30)
+            response.raise_for_status()
+            return f"Summary of {url}: {response.text[:300]}"
+        topic = task_input.get("topic", "")
+        results = task_input.get("search_results") or []
+        sections = "\n\n".join(f"## {r.get('title')}\n\n{r.get('snippet')} ([source]({r.get('link')}))" for r in results)
+        return {"content": f"---\ntitle: {topic}\nauthor: Benchmark\n---\n\n# {topic}\n\n{sections}\n"}
+
+    def get_execution(self, match, query, body):
+        execution = self.executions.get(match.group("execution_id"))
+        if execution is None:
+            return 404, {"detail": "Execution not found"}, "application/json"
+        with self._lock:
+            return 200, dict(execution), "application/json"
+
+    @staticmethod
+    def _page(items: list, query: Dict[str, str]) -> Dict[str, list]:
+        reverse = query.get("direction", "desc") == "desc"
+        key = query.get("sort_by", "created_at")
+        items = sorted(items, key=lambda item: item.get(key) or "", reverse=reverse)
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", 100))
+        return {"items": items[offset:offset + limit]}
+
+    def list_executions(self, match, query, body):
+        task_id = match.group("task_id")
+        with self._lock:
+            items = [dict(e) for e in self.executions.values() if e["task_id"] == task_id]
+        return 200, self._page(items, query), "application/json"
+
+    def list_transitions(self, match, query, body):
+        with self._lock:
+            items = [dict(t) for t in self.transitions.get(match.group("execution_id"), [])]
+        return 200, self._page(items, query), "application/json"
+
+
+def start_stubs(julep_latency: LatencyModel, execution_latency: LatencyModel, serper_latency: LatencyModel,
+                web_latency: LatencyModel) -> Dict[str, StubServer]:
+    """Starts the three stubs wired to each other; stop them with `stop_stubs`."""
+    serper = SerperStub(serper_latency).start()
+    web = WebStub(web_latency).start()
+    julep = JulepStub(julep_latency, execution_latency, serper_url=serper.url, reader_url=web.url).start()
+    return {"julep": julep, "serper": serper, "web": web}
+
+
+def stop_stubs(stubs: Dict[str, StubServer]):
+    for stub in stubs.values():
+        stub.stop()
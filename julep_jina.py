@@ -1,39 +1,87 @@
-from julep import Client
 import os
 import uuid
 import logging
 from dotenv import load_dotenv
-import yaml
 import time
 import argparse
-import requests
-from typing import Dict, Any
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
 import json
 from ast import literal_eval
+from tools.execution_waiter import ExecutionWaiter, TERMINAL_STATUSES
+from tools.execution_watcher import ExecutionWatcher
+from tools.execution_results import describe_transitions, execution_output, truncate_output
+from tools.content_cache import ContentCache, cached_get
+from tools.tracing import tracer
+from tools.readiness import ensure_resource
+from tools.url_batch import process_urls, write_result
+from tools.lazy import Lazy, lazy_attributes
 
-# Setup logging and environment
-load_dotenv()
-logging.basicConfig(level=logging.INFO)
+# julep, requests and yaml are imported where they are first needed, and the client,
+# watcher and cache below are built on first use, so importing this module stays cheap
 
-# Check for required environment variables
-if not os.getenv("JINA_API_KEY"):
-    raise EnvironmentError("The JINA_API_KEY environment variable must be set.")
-if not os.getenv("JULEP_API_KEY"):
-    raise EnvironmentError("The JULEP_API_KEY environment variable must be set.")
+# Setup environment (read by the settings below)
+load_dotenv()
 
 # Use fixed UUIDs for persistence (you can change these if needed)
 AGENT_UUID = uuid.UUID("a1b2c3d4-1234-5678-9101-abcdef123456")
 TASK_UUID = uuid.UUID("d4c3b2a1-4321-8765-1098-fedcba654321")
 
-# Initialize Julep Client
-client = Client(
-    api_key=os.getenv("JULEP_API_KEY"),
-    environment="dev",  # Or "prod", depending on your setup
-    timeout=30,
-)
+
+def _create_client():
+    # Check for required environment variables
+    if not os.getenv("JINA_API_KEY"):
+        raise EnvironmentError("The JINA_API_KEY environment variable must be set.")
+    if not os.getenv("JULEP_API_KEY"):
+        raise EnvironmentError("The JULEP_API_KEY environment variable must be set.")
+
+    from julep import Client
+
+    return Client(
+        api_key=os.getenv("JULEP_API_KEY"),
+        environment="dev",  # Or "prod", depending on your setup
+        base_url=os.getenv("JULEP_BASE_URL"),  # Overrides the environment when set
+        timeout=30,
+    )
+
+
+# Julep Client, initialized on first use
+get_client = Lazy(_create_client)
+
+# Jina Reader endpoint; overridable to point at a local stub server
+JINA_READER_URL = os.getenv("JINA_READER_URL", "https://r.jina.ai/")
+
+# Adaptive poller shared by all executions in this process; the watcher multiplexes
+# every in-flight execution onto a single polling loop
+waiter = ExecutionWaiter(timeout=90)
+get_watcher = Lazy(lambda: ExecutionWatcher(get_client(), waiter=waiter))
+# Extra seconds a worker waits for the watcher beyond the execution deadline, in case
+# the watcher loop itself stops answering
+WATCH_RESULT_MARGIN = 30
+
+# Fetch and log (truncated) full transition histories; set by --debug-transitions
+debug_transitions = False
+
+# Tool calls of one requires_action round are fetched concurrently by up to this many threads
+TOOL_CALL_WORKERS = int(os.getenv("JULEP_TOOL_CALL_WORKERS", 8))
+# Fetched pages longer than this are cut at a paragraph boundary before submission
+MAX_TOOL_OUTPUT_CHARS = int(os.getenv("JINA_MAX_TOOL_OUTPUT_CHARS", 40000))
+
+# On-disk cache of Jina Reader responses shared across topics and runs
+get_content_cache = Lazy(lambda: ContentCache(
+    os.getenv("JINA_CACHE_PATH", os.path.join(".cache", "jina_cache.sqlite3")),
+    max_bytes=int(os.getenv("JINA_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+    ttl=float(os.getenv("JINA_CACHE_TTL", 6 * 3600)),
+))
+
+# `julep_jina.client`, `.watcher` and `.content_cache` still work for importers
+__getattr__ = lazy_attributes(__name__, client=get_client, watcher=get_watcher, content_cache=get_content_cache)
 
 def create_julep_agent() -> None:
     """Creates or updates the Julep agent and registers the Jina tool."""
+    client = get_client()
     agent = client.agents.create_or_update(
         agent_id=AGENT_UUID,
         name="Jina Web Content Processor",
@@ -64,27 +112,94 @@ def create_julep_agent() -> None:
 
 def fetch_content_with_jina(url: str) -> str:
     """Fetches content from a URL using the Jina AI Reader API."""
+    import requests
+
     headers: Dict[str, str] = {'Authorization': f'Bearer {os.getenv("JINA_API_KEY")}'}
-    jina_url: str = f'https://r.jina.ai/{url}'
+    jina_url: str = f'{JINA_READER_URL.rstrip("/")}/{url}'
 
     logging.info(f"Starting Jina fetch for: {url}")
     for attempt in range(3):
         try:
             logging.debug(f"Attempt {attempt+1} - GET {jina_url}")
             start_time: float = time.time()
-            response: requests.Response = requests.get(jina_url, headers=headers, timeout=30)
-            response.raise_for_status()
-            logging.info(f"Jina success in {time.time()-start_time:.2f}s - Status {response.status_code}")
-            return response.text
+            with tracer.span("jina.fetch", url=url, attempt=attempt + 1) as span:
+                content: str = cached_get(get_content_cache(), requests.get, jina_url, headers=headers, timeout=30)
+                span.set(chars=len(content))
+            logging.info(f"Jina success in {time.time()-start_time:.2f}s")
+            return content
         except requests.exceptions.RequestException as e:
             logging.warning(f"Attempt {attempt+1} failed: {str(e)}")
             if attempt == 2:
                 logging.error(f"Final Jina failure for: {url}")
                 raise
-            time.sleep(2 ** attempt)
+            with tracer.span("jina.backoff", seconds=2 ** attempt):
+                time.sleep(2 ** attempt)
+
+def compact_content(text: str, max_chars: int = MAX_TOOL_OUTPUT_CHARS) -> str:
+    """
+    Shrinks fetched content before it is sent back to Julep: trailing spaces and runs of
+    blank lines are removed, and text beyond max_chars is cut at a paragraph boundary
+    with a note saying how much was dropped.
+    """
+    text = re.sub(r"[ \t]+\n", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text).strip()
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n\n", 0, max_chars)
+    if cut < max_chars // 2:
+        cut = max_chars
+    return f"{text[:cut].rstrip()}\n\n[Content truncated: kept {cut} of {len(text)} characters]"
+
+def handle_tool_call(tool_call) -> Dict[str, str]:
+    """Runs one fetch_web_content call and returns its entry for submit_tool_outputs."""
+    logging.info(f"Handling fetch_web_content call with args: {tool_call.function.arguments}")
+    try:
+        # Safely evaluate the arguments (which are Python expressions)
+        args = literal_eval(tool_call.function.arguments)
+        result: str = fetch_content_with_jina(**args)
+        logging.debug(f"Jina response length: {len(result)} characters")
+        if not result.strip():
+            raise ValueError("Received empty content from Jina AI Reader")
+    except Exception as e:
+        logging.error(f"Failed to fetch content: {e}")
+        raise
+    content = compact_content(result)
+    if len(content) < len(result):
+        logging.debug(f"Compacted tool output from {len(result)} to {len(content)} characters")
+    return {
+        "tool_call_id": tool_call.id,
+        "output": json.dumps({"content": content})  # Structured output
+    }
+
+def handle_tool_calls(tool_calls) -> List[Dict[str, str]]:
+    """
+    Runs all fetch_web_content calls of a requires_action round concurrently, so the
+    round takes as long as the slowest fetch rather than the sum of all of them.
+
+    Returns:
+        Tool outputs in the order of the calls; raises if any fetch failed.
+    """
+    calls = []
+    for tool_call in tool_calls:  # Using 'tool_calls' as per official patterns
+        logging.debug(f"Processing tool call: {tool_call.id}")
+        if tool_call.function.name == "fetch_web_content":
+            calls.append(tool_call)
+        else:
+            logging.warning(f"Ignoring unknown tool call {tool_call.function.name} ({tool_call.id})")
+    if not calls:
+        return []
+    if len(calls) == 1:
+        return [handle_tool_call(calls[0])]
+
+    with ThreadPoolExecutor(max_workers=min(TOOL_CALL_WORKERS, len(calls))) as executor:
+        # One context copy per call keeps the trace spans of each fetch under this request
+        futures = [executor.submit(contextvars.copy_context().run, handle_tool_call, call) for call in calls]
+        return [future.result() for future in futures]
 
 def create_julep_task() -> None:
     """Creates or updates the Julep task to use the registered tool."""
+    import yaml
+
     task_def = yaml.safe_load(f"""
 input_schema:
   type: object
@@ -105,7 +220,7 @@ output_schema:
   type: string
   description: The summarized text.
 """)
-    task = client.tasks.create_or_update(
+    task = get_client().tasks.create_or_update(
         task_id=TASK_UUID,
         agent_id=AGENT_UUID,
         **task_def
@@ -113,110 +228,130 @@ output_schema:
     logging.info("Julep Task created/updated: %s", task)
 
 def ensure_agent_and_task_ready() -> None:
-    """Ensure agent and task exist."""
-    try:
-        client.agents.get(AGENT_UUID)
-    except Exception as e:
-        if "not found" in str(e).lower():
-            create_julep_agent()
-            time.sleep(5)  # Allow some time for the agent to be registered
-        else:
-            raise
-
-    try:
-        client.tasks.get(TASK_UUID)
-    except Exception as e:
-        if "not found" in str(e).lower():
-            create_julep_task()
-            time.sleep(5)  # Allow some time for the task to be registered
-        else:
-            raise
+    """Ensure agent and task exist; missing ones are created and polled until registered."""
+    client = get_client()
+    ensure_resource(client.agents.get, AGENT_UUID, create_julep_agent)
+    ensure_resource(client.tasks.get, TASK_UUID, create_julep_task)
 
 def process_url_with_julep(url: str) -> str:
     """Processes a URL using Julep, fetching content via the registered Jina tool and summarizing it."""
+    # Root span of the URL; creation, waits and tool calls nest below it
+    with tracer.span("process_url", url=url):
+        return _process_url_with_julep(url)
+
+def _process_url_with_julep(url: str) -> str:
+    client = get_client()
     logging.debug(f"Starting execution for URL: {url}")
     try:
-        execution = client.executions.create(
-            task_id=TASK_UUID,
-            input={"url": url}
-        )
+        with tracer.span("julep.executions.create"):
+            execution = client.executions.create(
+                task_id=TASK_UUID,
+                input={"url": url}
+            )
     except Exception as e:
         logging.error(f"Julep execution creation failed: {e}")
         raise
+    tracer.current().set(execution_id=str(execution.id))
     logging.info(f"Created execution ID: {execution.id} with input: {{\"url\": {url}}}")
 
-    max_retries: int = 15
-    retries: int = 0
-    while retries < max_retries:
-        logging.debug(f"Checking execution status (attempt {retries+1}/{max_retries})")
-        execution = client.executions.get(execution.id)
-        logging.debug(f"Current status: {execution.status}")
+    def log_status(current, attempt: int) -> None:
+        logging.debug(f"Current status: {current.status} (check {attempt})")
+
+    # Tool calls already answered; the status stays requires_action for a moment after a
+    # submission, and those calls must not be handled (and submitted) a second time
+    answered = set()
+
+    def has_new_calls(current) -> bool:
+        # Executions without tool_calls (older SDK models) stop right away and fail below
+        calls = getattr(current, "tool_calls", None)
+        if current.status != "requires_action" or calls is None:
+            return True
+        return any(call.id not in answered for call in calls)
+
+    while True:
+        # The deadline restarts after every tool output submission
+        with tracer.span("julep.wait") as span:
+            execution, transitions = get_watcher().watch_threadsafe(
+                execution.id,
+                task_id=TASK_UUID,
+                stop_statuses=TERMINAL_STATUSES | {"requires_action"},
+                on_poll=log_status,
+                history=debug_transitions or tracer.enabled,
+                stop_if=has_new_calls,
+            ).result(timeout=waiter.timeout + WATCH_RESULT_MARGIN)
+            span.set(status=execution.status)
 
         if execution.status == "requires_action":
             logging.info("Execution requires action - checking tool calls")
-            for tool_call in execution.tool_calls:  # Using 'tool_calls' as per official patterns
-                logging.debug(f"Processing tool call: {tool_call.id}")
-                if tool_call.function.name == "fetch_web_content":
-                    logging.info(f"Handling fetch_web_content call with args: {tool_call.function.arguments}")
-                    try:
-                        # Safely evaluate the arguments (which are Python expressions)
-                        args = literal_eval(tool_call.function.arguments)
-                        result: str = fetch_content_with_jina(**args)
-                        logging.debug(f"Jina response length: {len(result)} characters")
-                        if not result.strip():
-                            raise ValueError("Received empty content from Jina AI Reader")
-                    except Exception as e:
-                        logging.error(f"Failed to fetch content: {e}")
-                        raise
-
-                    logging.info("Submitting tool outputs back to Julep")
-                    time.sleep(1)  # Short delay before submission
-                    client.executions.submit_tool_outputs(
+            submit_tool_outputs = getattr(client.executions, "submit_tool_outputs", None)
+            tool_calls = getattr(execution, "tool_calls", None)
+            if submit_tool_outputs is None or tool_calls is None:
+                raise RuntimeError(
+                    f"Execution {execution.id} requires action, but the installed julep SDK cannot "
+                    f"{'submit tool outputs' if submit_tool_outputs is None else 'read its tool calls'}"
+                )
+            new_calls = [call for call in tool_calls if call.id not in answered]
+            with tracer.span("tool_calls", calls=len(new_calls)):
+                outputs = handle_tool_calls(new_calls)
+            # Unknown tools are skipped by handle_tool_calls; they count as seen as well
+            answered.update(call.id for call in new_calls)
+            if outputs:
+                # One submission for the whole round
+                logging.info(f"Submitting {len(outputs)} tool output(s) back to Julep")
+                with tracer.span("julep.executions.submit_tool_outputs", outputs=len(outputs)):
+                    submit_tool_outputs(
                         execution_id=execution.id,
-                        outputs=[{
-                            "tool_call_id": tool_call.id,
-                            "output": json.dumps({"content": result})  # Structured output
-                        }]
+                        outputs=outputs
                     )
-                    logging.debug("Tool output submitted successfully")
-                    retries = 0  # Reset retry counter after successful submission
+                logging.debug("Tool outputs submitted successfully")
 
         elif execution.status in ["completed", "succeeded"]:
             logging.info("Execution completed successfully")
-            transitions = client.executions.transitions.list(execution_id=execution.id).items
-            if transitions and hasattr(transitions[0], "output"):
-                logging.debug(f"Transition output (first 200 characters): {transitions[0].output[:200]}...")
-                return transitions[0].output
-            else:
-                logging.warning("No transitions found in completed execution")
+            if debug_transitions or tracer.enabled:
+                tracer.add_transitions(execution, transitions)
+            if debug_transitions:
+                for line in describe_transitions(transitions):
+                    logging.info(line)
+            output = execution_output(execution, transitions)
+            if output is None:
+                logging.warning("No output found in completed execution")
                 return "No output"
+            logging.debug(f"Execution output: {truncate_output(output, 200)}")
+            return output
 
-        elif execution.status in ["failed", "cancelled"]:
+        else:
             logging.error(f"Execution failed with status: {execution.status}")
             if hasattr(execution, "last_error") and execution.last_error:
                 logging.error(f"Error details: {execution.last_error}")
             raise RuntimeError(f"Execution failed: {execution.status}")
 
-        else:
-            logging.debug(f"Still processing... (status: {execution.status})")
-
-        time.sleep(3)
-        retries += 1
-
-    logging.error(f"Timeout after {max_retries} retries")
-    raise TimeoutError("Processing timed out")
-
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Process URLs with Julep and Jina Reader")
     parser.add_argument("urls", nargs="+", help="URLs to process")
+    parser.add_argument("--workers", type=int, default=4, help="URLs processed at the same time (default: 4)")
+    parser.add_argument("--output", metavar="FILE", help="Append one JSON line per finished URL to FILE instead of printing")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Record spans and write them to FILE (.jsonl for JSON Lines, else Chrome trace format)")
+    parser.add_argument("--debug-transitions", action="store_true",
+                        help="Fetch and log every execution's transitions (outputs truncated)")
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.trace:
+        tracer.enable()
+    debug_transitions = args.debug_transitions
 
     # Ensure agent and task are ready before processing
     ensure_agent_and_task_ready()
 
-    for url in args.urls:
-        try:
-            result = process_url_with_julep(url)
-            print(f"\nURL: {url}\nSummary: {result}")
-        except Exception as e:
-            logging.error(f"Error processing {url}: {e}")
\ No newline at end of file
+    # All workers share the watcher's single polling loop; results stream as URLs finish
+    output = open(args.output, "a", encoding="utf-8") if args.output else None
+    try:
+        for record in process_urls(process_url_with_julep, args.urls, args.workers):
+            write_result(record, output, label="Summary")
+    finally:
+        if output is not None:
+            output.close()
+
+    logging.info(get_content_cache().summary())
+    if args.trace:
+        logging.info(f"Wrote {tracer.export(args.trace)} spans to {args.trace}")
\ No newline at end of file
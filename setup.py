@@ -11,6 +11,7 @@ setup(
         "pyyaml",
         "python-dotenv",
         "julep",
+        "httpx",
     ],
     python_requires=">=3.8",
 ) 
\ No newline at end of file
@@ -1,17 +1,47 @@
 import os
-import yaml
-from julep import Client
-from dotenv import load_dotenv
-from pprint import pprint
 import asyncio
 from pathlib import Path
 import uuid  # Add this import to generate valid UUIDs
 import logging
+import argparse
+import re
+import sys
+import time
+from tools.stage_graph import StageGraph, StageError
+from tools.execution_waiter import ExecutionWaiter, ExecutionTimeoutError
+from tools.execution_watcher import ExecutionWatcher
+from tools.execution_results import describe_transitions, execution_output
+from tools.loop_monitor import LoopLagMonitor
+from tools.task_registry import TaskRegistry
+from tools.search_cache import SearchCache
+from tools.task_definitions import TaskDefinitionCache, inject_placeholders
+from tools.dedup import deduplicate_search_results
+from tools.context_packer import pack_context
+from tools.tracing import tracer
 
+# julep, httpx and dotenv are imported where they are needed, so helpers such as
+# percentile or create_search_query (and --help) don't pay for the SDK import
+
+# Tasks executed by processing_pipeline
+PIPELINE_TASKS = (
+    "serper_search_api_call_task",
+    "serper_image_api_call_task",
+    "blog_prompt_engineering_task",
+)
 
 
 class BlogAutomation:
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 4, max_connections: int = 20, sources: list = None,
+                 debug_transitions: bool = False):
+        # Maximum number of pipeline stages allowed to run at the same time
+        self.max_concurrency = max_concurrency
+        # Preferred sites, most authoritative first; used to pick among duplicate results
+        self.sources = sources if sources is not None else DEFAULT_SOURCES
+        # Estimated prompt tokens available for search and image results
+        self.token_budget = int(os.getenv("PROMPT_TOKEN_BUDGET", 1500))
+        # Fetch and print (truncated) full transition histories; off by default
+        self.debug_transitions = debug_transitions
+
         # Set base_dir first
         self.base_dir = Path(__file__).parent.parent  # Points to project root
         self.tasks_dir = self.base_dir / "tasks"  # Where task YAMLs reside
@@ -23,10 +53,43 @@ class BlogAutomation:
         if not self.tasks_dir.exists():
             raise FileNotFoundError(f"Tasks directory not found at: {self.tasks_dir}")
         
-        self.client = Client(api_key=self.julep_api_key, environment="production")
+        import httpx
+        from julep import AsyncClient, DefaultAsyncHttpxClient
+
+        # Async client so Julep round trips never block the event loop; all requests
+        # share one bounded HTTP connection pool
+        self.client = AsyncClient(
+            api_key=self.julep_api_key,
+            environment="production",
+            # Overrides the environment, e.g. to point at a local stub server
+            base_url=os.getenv("JULEP_BASE_URL"),
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            ),
+        )
+        # Single polling loop shared by all executions started by the pipeline
+        self.waiter = ExecutionWaiter(timeout=180)
+        self.watcher = ExecutionWatcher(self.client, waiter=self.waiter)
+        # Stable task IDs plus local content hashes of the last uploaded definitions
+        self.registry = TaskRegistry(self.client, self.agent_id, self.base_dir / ".task_registry.json")
+        # Parsed task YAML, reused across instances and runs while the files are unchanged
+        self.task_cache = TaskDefinitionCache(
+            os.getenv("TASK_DEFS_CACHE_PATH") or self.base_dir / ".cache" / "task_defs.json"
+        )
+        # Local cache in front of the Serper stages; a hit skips the Julep execution
+        self.search_cache = SearchCache(
+            os.getenv("SERPER_CACHE_PATH") or self.base_dir / ".cache" / "serper_cache.sqlite3",
+            ttl=float(os.getenv("SERPER_CACHE_TTL", 24 * 3600)),
+            max_entries=int(os.getenv("SERPER_CACHE_MAX_ENTRIES", 1000)),
+        )
 
     def load_environment(self):
         """Updated to match .env structure"""
+        from dotenv import load_dotenv
+
         load_dotenv(dotenv_path=self.base_dir / '.env', override=True)
         
         # Required variables from .env
@@ -53,142 +116,321 @@ class BlogAutomation:
 
         print(f"Tasks directory: {self.tasks_dir}")
 
-    def load_task_definitions(self):
-        """Load all task YAMLs from directory with template variables"""
+    def load_task_definitions(self, names=PIPELINE_TASKS):
+        """
+        Load task definitions (by default only the pipeline's) with template variables.
+        Parsed YAML comes from the task definition cache, so unchanged files are not
+        re-parsed; secrets are filled into a copy of each tree.
+        """
         task_defs = {}
-        for yaml_file in self.tasks_dir.glob("*.yaml"):
-            print(f"Loading task: {yaml_file.stem}")
-            with open(yaml_file, "r") as f:
-                content = f.read()
-
-            content = content.replace("<SERPER_API_KEY>", self.serper_api_key)
-            task_defs[yaml_file.stem] = yaml.safe_load(content)
+        parsed = self.task_cache.load_all(self.tasks_dir, names)
+        for name, definition in parsed.items():
+            print(f"Loading task: {name}")
+            task_defs[name] = inject_placeholders(definition, {"<SERPER_API_KEY>": self.serper_api_key})
 
         return task_defs
 
     async def run_task(self, task_name: str, inputs: dict):
         """Execute a specific task by name"""
+        from julep import NotFoundError
+
         print(f"\n=== Starting task: {task_name} ===")
         task_def = self.task_definitions.get(task_name)
         if not task_def:
             raise ValueError(f"Task {task_name} not found in definitions")
         
-        # Matches working example's fixed UUID
-        task_id = "d4c3b2a1-4321-8765-1098-fedcba654321"
+        # Stable per-task ID; the registry uploads definitions only when they change
+        task_id = self.registry.task_id(task_name)
 
-        
-        # Create/update task with proper timeout
-        try:
-            self.client.tasks.create_or_update(
-                task_id=task_id,
-                agent_id=self.agent_id,
-                **task_def
-            )
-        except Exception as e:
-            logging.error(f"Failed to create/update task {task_name}: {str(e)}")
-            raise
-
-        # Create execution with simplified input structure
-        execution = self.client.executions.create(
-            task_id=task_id,
-            input=inputs  # Direct dict like working example
-        )
+        with tracer.span(f"task.{task_name}", task_id=task_id) as span:
+            # Create execution with simplified input structure
+            try:
+                with tracer.span("julep.executions.create"):
+                    execution = await self.client.executions.create(
+                        task_id=task_id,
+                        input=inputs  # Direct dict like working example
+                    )
+            except NotFoundError:
+                # The task was deleted remotely since it was last uploaded
+                logging.warning(f"Task {task_name} missing on the server, uploading it again")
+                await self.registry.upload(task_name, task_def)
+                with tracer.span("julep.executions.create"):
+                    execution = await self.client.executions.create(
+                        task_id=task_id,
+                        input=inputs
+                    )
+            span.set(execution_id=str(execution.id))
+
+            # Adaptive execution monitoring bounded by a deadline
+            def log_status(execution, attempt):
+                print(f"{task_name} status: {execution.status} (Check {attempt})")
+                span.set(status=execution.status, checks=attempt)
 
-        # Improved execution monitoring with timeout
-        max_retries = 15  # Reduced from 20 to fail faster
-        retries = 0
-        while True:
+            # The full history is only needed for debug dumps and trace spans
+            history = self.debug_transitions or tracer.enabled
             try:
-                execution = self.client.executions.get(execution.id)
-                current_status = execution.status
-                print(f"{task_name} status: {current_status} (Retry {retries}/{max_retries})")
-                
-                if current_status in ["completed", "succeeded", "failed", "cancelled", "expired"]:
-                    break
-                    
-                if retries >= max_retries:
-                    raise RuntimeError(f"Timeout after {max_retries} retries. Final status: {current_status}")
-                    
-                await asyncio.sleep(2)
-                retries += 1
-                
+                with tracer.span("julep.wait"):
+                    execution, transitions = await self.watcher.watch(
+                        execution.id,
+                        task_id=task_id,
+                        on_poll=log_status,
+                        history=history,
+                    )
+            except ExecutionTimeoutError as e:
+                logging.error(f"Timed out waiting for {task_name}: {str(e)}")
+                raise
             except Exception as e:
                 logging.error(f"Error checking execution status: {str(e)}")
                 raise
 
-        # Add transition logging like working example
-        transitions = self.client.executions.transitions.list(execution_id=execution.id).items
-        if transitions:
+            if history:
+                # Server-side history: queueing and step timings
+                tracer.add_transitions(execution, transitions)
+
+        if self.debug_transitions and transitions:
             print(f"Found {len(transitions)} transitions for {task_name}:")
-            for i, t in enumerate(transitions):
-                print(f"Transition {i}: Type: {t.type}, Output: {t.output}")
+            for line in describe_transitions(transitions):
+                print(line)
 
         if execution.status == "succeeded":
-            # Return the output of the first transition
-            return transitions[0].output if transitions else None
+            # The execution's own output, else the newest finish transition
+            return execution_output(execution, transitions)
         
         print(f"Task {task_name} failed. Final status: {execution.status}")
         return None
 
-    async def processing_pipeline(self, search_query: str):
-
-        """processing pipeline execution"""
-
-        # Initialize agent once
-        self.client.agents.create_or_update(
-            agent_id=self.agent_id,
-            name="Blog Generation Agent",
-            about="Advanced blog generator using Jina AI API",
-            model="gpt-4o",
-        )
-
-         # Load all task definitions
-        self.task_definitions = self.load_task_definitions()
+    async def search_stage(self, inputs: dict):
+        """Runs the Serper search task and returns the organic results"""
+        organic = self.search_cache.get("search", inputs["query"])
+        if organic is not None:
+            print("Serper search served from cache")
+            tracer.current().set(cache="hit")
+            return organic
 
         serper_response = await self.run_task(
             "serper_search_api_call_task",
             {
-                "query": search_query
+                "query": inputs["query"]
             }
         )
 
-        if serper_response.get('json') and serper_response.get('json').get('organic'):
+        if serper_response and serper_response.get('json') and serper_response.get('json').get('organic'):
             organic = serper_response.get('json').get('organic')
-        else:
-            print("Error: 'organic' key not found in serper_response or 'json' key not present.")
-            return "Error: 'organic' key not found in serper_response or 'json' key not present."
+            self.search_cache.set("search", inputs["query"], organic)
+            return organic
+        raise ValueError("'organic' key not found in serper_response or 'json' key not present.")
+
+    async def images_stage(self, inputs: dict):
+        """Runs the Serper image task and returns the image results"""
+        images = self.search_cache.get("images", inputs["query"])
+        if images is not None:
+            print("Serper images served from cache")
+            tracer.current().set(cache="hit")
+            return images
 
         serper_response = await self.run_task(
             "serper_image_api_call_task",
             {
-                "query": search_query
+                "query": inputs["query"]
             }
         )
-        
-        if serper_response.get('json') and serper_response.get('json').get('images'):
+
+        if serper_response and serper_response.get('json') and serper_response.get('json').get('images'):
             images = serper_response.get('json').get('images')
-        else:
-            print("Error: 'images' key not found in serper_response or 'json' key not present.")
-            return "Error: 'images' key not found in serper_response or 'json' key not present."
+            self.search_cache.set("images", inputs["query"], images)
+            return images
+        raise ValueError("'images' key not found in serper_response or 'json' key not present.")
+
+    async def dedup_stage(self, inputs: dict):
+        """Drops near-duplicate search results (e.g. syndicated wire stories)"""
+        organic, report = deduplicate_search_results(inputs["search"], self.sources)
+        print(
+            f"Deduplicated search results: kept {report['kept']}/{report['input']}, "
+            f"dropped {report['dropped']} ({report['chars_dropped']} chars)"
+        )
+        return organic
 
-        blog_post = await self.run_task(
+    async def pack_stage(self, inputs: dict):
+        """Fits the most relevant results and a few images into the prompt token budget"""
+        results, images, report = pack_context(
+            inputs["dedup"], inputs["images"], inputs["query"], token_budget=self.token_budget
+        )
+        print(
+            f"Packed prompt context: {report['used']}/{report['budget']} tokens, "
+            f"{report['results_kept']}/{report['results_in']} results "
+            f"({report['truncated']} truncated), {report['images_kept']} images"
+        )
+        return {"search_results": results, "image_results": images}
+
+    async def blog_stage(self, inputs: dict):
+        """Generates the blog post from the search and image results"""
+        return await self.run_task(
             "blog_prompt_engineering_task",
             {
-                "search_results": organic,
-                "topic": search_query,
-                "image_results": images
+                "search_results": inputs["pack"]["search_results"],
+                "topic": inputs["query"],
+                "image_results": inputs["pack"]["image_results"]
             }
         )
 
-        if blog_post:
-            output_path = self.base_dir / "generated_blog.md"
-            # Directly access the evaluated content
-            content = blog_post.get("content", "")
-            # Normalize and remove unwanted characters
-            cleaned_content = content.encode("utf-8", "ignore").decode("utf-8")
+    async def write_stage(self, inputs: dict):
+        """Writes the generated blog post to disk"""
+        blog_post = inputs["blog"]
+        if not blog_post:
+            return None
+
+        output_path = Path(inputs["output_path"])
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Directly access the evaluated content
+        content = blog_post.get("content", "")
+        # Normalize and remove unwanted characters
+        cleaned_content = content.encode("utf-8", "ignore").decode("utf-8")
+
+        output_path.write_text(cleaned_content, encoding="utf-8")
+        print(f"Blog generated successfully at {output_path}")
+        return output_path
+
+    def build_pipeline_graph(self) -> StageGraph:
+        """
+        Describes the pipeline as a dependency graph. Stages without a dependency
+        between them (search and images) run concurrently; new stages only need
+        to declare the results they consume.
+        """
+        graph = StageGraph(max_concurrency=self.max_concurrency)
+        graph.add_stage("search", self.search_stage, deps=["query"])
+        graph.add_stage("images", self.images_stage, deps=["query"])
+        graph.add_stage("dedup", self.dedup_stage, deps=["search"])
+        graph.add_stage("pack", self.pack_stage, deps=["query", "dedup", "images"])
+        graph.add_stage("blog", self.blog_stage, deps=["query", "pack"])
+        graph.add_stage("write", self.write_stage, deps=["blog", "output_path"])
+        return graph
+
+    async def prepare(self):
+        """Upserts the agent and loads task definitions; runs once per instance"""
+        if getattr(self, "task_definitions", None) is not None:
+            return
+
+        with tracer.span("prepare"):
+            # Initialize agent once
+            with tracer.span("julep.agents.create_or_update"):
+                await self.client.agents.create_or_update(
+                    agent_id=self.agent_id,
+                    name="Blog Generation Agent",
+                    about="Advanced blog generator using Jina AI API",
+                    model="gpt-4o",
+                )
 
-            output_path.write_text(cleaned_content, encoding="utf-8")
-            print(f"Blog generated successfully at {output_path}")
+            # Load the pipeline's task definitions
+            with tracer.span("load_task_definitions") as span:
+                task_definitions = self.load_task_definitions()
+                span.set(cache_hits=self.task_cache.hits, cache_misses=self.task_cache.misses)
+
+            # Upload only the pipeline's tasks whose definition changed since the last run
+            await self.registry.sync(task_definitions)
+        self.task_definitions = task_definitions
+
+    async def processing_pipeline(self, search_query: str, output_path=None):
+
+        """processing pipeline execution"""
+
+        # Root span of the topic; every stage, task and API call nests below it
+        with tracer.span("pipeline", topic=search_query) as span:
+            await self.prepare()
+
+            if output_path is None:
+                output_path = self.base_dir / "generated_blog.md"
+
+            graph = self.build_pipeline_graph()
+            try:
+                results = await graph.run({"query": search_query, "output_path": output_path})
+            except StageError as e:
+                print(f"Error in stage {e.stage}: {e.error}")
+                span.set(failed_stage=e.stage, error=str(e.error))
+                return f"Error: {e.error}"
+
+        return results["write"]
+
+    async def run_batch(self, topics: list, output_dir, sources: list, concurrency: int = 4):
+        """
+        Runs many topics through processing_pipeline with bounded concurrency.
+
+        Args:
+            topics: Topics to generate blogs for.
+            output_dir: Directory receiving one markdown file per topic.
+            sources: Sites the search is restricted to.
+            concurrency: Maximum number of pipelines running at the same time.
+
+        Returns:
+            A list of per-topic dictionaries with 'topic', 'output', 'ok' and 'latency' keys.
+        """
+        await self.prepare()
+        output_dir = Path(output_dir)
+        semaphore = asyncio.Semaphore(concurrency)
+        used_names = set()
+
+        async def run_one(topic: str):
+            name = slugify(topic) or "blog"
+            candidate, index = name, 2
+            while candidate in used_names:
+                candidate, index = f"{name}-{index}", index + 1
+            used_names.add(candidate)
+            output_path = output_dir / f"{candidate}.md"
+
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    result = await self.processing_pipeline(
+                        create_search_query(topic, sources), output_path=output_path
+                    )
+                except Exception as e:
+                    logging.error(f"Pipeline failed for topic {topic}: {str(e)}")
+                    result = None
+                latency = time.perf_counter() - start
+
+            ok = isinstance(result, Path)
+            print(f"[{'ok' if ok else 'failed'}] {topic} ({latency:.1f}s)")
+            return {"topic": topic, "output": str(output_path) if ok else None, "ok": ok, "latency": latency}
+
+        return await asyncio.gather(*(run_one(topic) for topic in topics))
+
+
+def slugify(text: str, max_length: int = 80) -> str:
+    """Turns a topic into a safe file name"""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:max_length].rstrip("-")
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def read_topics(path: str) -> list:
+    """Reads one topic per line from a file, or from stdin when path is '-'"""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
+
+def print_batch_summary(records: list, wall_time: float):
+    """Prints throughput and latency statistics for a batch run"""
+    latencies = [r["latency"] for r in records]
+    succeeded = sum(1 for r in records if r["ok"])
+    print("\n=== Batch summary ===")
+    print(f"Topics: {len(records)} (succeeded: {succeeded}, failed: {len(records) - succeeded})")
+    print(f"Wall time: {wall_time:.1f}s")
+    if wall_time > 0:
+        print(f"Throughput: {len(records) / wall_time * 60:.2f} topics/min")
+    print(
+        f"Latency: p50 {percentile(latencies, 50):.1f}s, "
+        f"p95 {percentile(latencies, 95):.1f}s, "
+        f"max {max(latencies, default=0.0):.1f}s"
+    )
 
 
 # Function to create a search query for a topic with specified sources
@@ -199,23 +441,59 @@ def create_search_query(topic, sources):
     search_query = f"{topic} site:{sources_query}"
     return search_query
 
+# Sites the Serper search is restricted to
+DEFAULT_SOURCES = [
+    "www.bbc.com",
+    "www.nytimes.com",
+    "www.reuters.com",
+    "www.theguardian.com",
+    "www.washingtonpost.com"
+]
+
 async def main():
-    automation = BlogAutomation()
+    parser = argparse.ArgumentParser(description="Generate blog posts with Julep")
+    parser.add_argument("--batch", metavar="FILE", help="File with one topic per line ('-' reads stdin)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Pipelines run at the same time in batch mode")
+    parser.add_argument("--output-dir", default=None, help="Directory for batch outputs (default: generated_blogs/)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Record spans and write them to FILE (.jsonl for JSON Lines, else Chrome trace format)")
+    parser.add_argument("--debug-transitions", action="store_true",
+                        help="Fetch and print every execution's transitions (outputs truncated)")
+    args = parser.parse_args()
+
+    if args.trace:
+        tracer.enable()
+    try:
+        await run(args)
+    finally:
+        if args.trace:
+            count = tracer.export(args.trace)
+            print(f"Wrote {count} spans to {args.trace}")
+
+async def run(args):
+    automation = BlogAutomation(debug_transitions=args.debug_transitions)
+
+    if args.batch:
+        topics = read_topics(args.batch)
+        output_dir = args.output_dir or automation.base_dir / "generated_blogs"
+        start = time.perf_counter()
+        async with LoopLagMonitor() as monitor:
+            records = await automation.run_batch(topics, output_dir, DEFAULT_SOURCES, args.concurrency)
+        print_batch_summary(records, time.perf_counter() - start)
+        print(monitor.summary())
+        print(automation.search_cache.summary())
+        return
+
     search_query = os.getenv("SEARCH_QUERY")
-    sources = [
-    "www.bbc.com", 
-    "www.nytimes.com", 
-    "www.reuters.com", 
-    "www.theguardian.com", 
-    "www.washingtonpost.com"
-    ]
-    
     if not search_query:
         search_query = input("Enter search query: ")
     
-    search_query = create_search_query(search_query, sources)
+    search_query = create_search_query(search_query, DEFAULT_SOURCES)
 
-    await automation.processing_pipeline(search_query)
+    async with LoopLagMonitor() as monitor:
+        await automation.processing_pipeline(search_query)
+    print(monitor.summary())
+    print(automation.search_cache.summary())
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main())
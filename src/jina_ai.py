@@ -1,29 +1,41 @@
-from julep import Client
 import os
 import uuid
 import logging
 from dotenv import load_dotenv
-import yaml
-import time
 import argparse
+from tools.execution_waiter import ExecutionWaiter
+from tools.execution_results import fetch_output
+from tools.readiness import ReadyOnce, ensure_resource
+from tools.url_batch import process_urls, write_result
+from tools.lazy import Lazy, lazy_attributes
 
-# Setup logging and environment
+# Setup environment; julep and yaml are imported on first use
 load_dotenv()
-logging.basicConfig(level=logging.INFO)
 
 # Use fixed UUIDs for persistence
-AGENT_UUID = uuid.UUID('a1b2c3d4-1234-5678-9101-jinawebreader123')
-TASK_UUID = uuid.UUID('d4c3b2a1-4321-8765-1098-jinatask654321')
+AGENT_UUID = uuid.UUID('a1b2c3d4-1234-5678-9101-0e0b0eade123')
+TASK_UUID = uuid.UUID('d4c3b2a1-4321-8765-1098-0e0b7a5c4321')
 
-client = Client(
-    api_key=os.getenv("JULEP_API_KEY"),
-    environment="dev",
-    timeout=30
-)
+def _create_client():
+    from julep import Client
+
+    return Client(
+        api_key=os.getenv("JULEP_API_KEY"),
+        environment="dev",
+        base_url=os.getenv("JULEP_BASE_URL"),  # Overrides the environment when set
+        timeout=30
+    )
+
+# Julep client, built on first use; `jina_ai.client` keeps working for importers
+get_client = Lazy(_create_client)
+__getattr__ = lazy_attributes(__name__, client=get_client)
+
+# Adaptive poller shared by all executions in this process
+waiter = ExecutionWaiter(timeout=60)
 
 def create_agent():
     """Create or update the Jina web reader agent"""
-    agent = client.agents.create_or_update(
+    agent = get_client().agents.create_or_update(
         agent_id=AGENT_UUID,
         name="Jina Web Processor",
         about="Specializes in processing web content using Jina Reader",
@@ -34,6 +46,8 @@ def create_agent():
 
 def create_task():
     """Create or update the Jina processing task"""
+    import yaml
+
     task_def = yaml.safe_load(f"""
     name: Web Content Processor
     description: Process web content with Jina Reader
@@ -61,7 +75,7 @@ def create_task():
       unwrap: true
     """)
     
-    task = client.tasks.create_or_update(
+    task = get_client().tasks.create_or_update(
         task_id=TASK_UUID,
         agent_id=AGENT_UUID,
         **task_def
@@ -70,58 +84,49 @@ def create_task():
     return task
 
 def ensure_agent_and_task_ready():
-    """Ensure agent/task exist before execution"""
-    try:
-        client.agents.get(AGENT_UUID)
-    except Exception as e:
-        if "not found" in str(e).lower():
-            create_agent()
-        else:
-            raise
+    """Ensure agent/task exist before execution; missing ones are created and polled until registered"""
+    client = get_client()
+    ensure_resource(client.agents.get, AGENT_UUID, create_agent)
+    ensure_resource(client.tasks.get, TASK_UUID, create_task)
 
-    try:
-        client.tasks.get(TASK_UUID)
-    except Exception as e:
-        if "not found" in str(e).lower():
-            create_task()
-        else:
-            raise
+# Checked on the first URL only, however many URLs and threads follow
+ensure_ready = ReadyOnce(ensure_agent_and_task_ready)
 
 def process_url(url):
     """Process a URL through Jina Reader"""
-    ensure_agent_and_task_ready()
+    ensure_ready()
+    client = get_client()
     
     execution = client.executions.create(
         task_id=TASK_UUID,
         input={"url": url}
     )
     
-    # Wait for completion with timeout
-    max_retries = 10
-    retries = 0
-    while retries < max_retries:
-        execution = client.executions.get(execution.id)
-        if execution.status in ["completed", "succeeded"]:
-            transitions = client.executions.transitions.list(execution_id=execution.id).items
-            return transitions[0].output if transitions else "No output"
-        if execution.status in ["failed", "cancelled"]:
-            raise RuntimeError(f"Execution failed with status: {execution.status}")
-        time.sleep(2)
-        retries += 1
-        
-    raise TimeoutError("Processing timed out")
+    # Wait for completion with adaptive backoff until the deadline
+    execution = waiter.wait(client.executions.get, execution.id)
+    if execution.status in ["completed", "succeeded"]:
+        # Uses the execution's own output, else fetches only the newest transition
+        output = fetch_output(client, execution)
+        return output if output is not None else "No output"
+    raise RuntimeError(f"Execution failed with status: {execution.status}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Process URLs with Jina Reader')
     parser.add_argument('urls', nargs='+', help='URLs to process')
+    parser.add_argument('--workers', type=int, default=4, help='URLs processed at the same time (default: 4)')
+    parser.add_argument('--output', metavar='FILE', help='Append one JSON line per finished URL to FILE instead of printing')
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
 
     create_agent()
     create_task()
+    ensure_ready()
 
-    for url in args.urls:
-        try:
-            result = process_url(url)
-            print(f"\nURL: {url}\nResult: {result}")
-        except Exception as e:
-            logging.error("Error processing %s: %s", url, e) 
\ No newline at end of file
+    # Results stream as URLs finish
+    output = open(args.output, 'a', encoding='utf-8') if args.output else None
+    try:
+        for record in process_urls(process_url, args.urls, args.workers):
+            write_result(record, output)
+    finally:
+        if output is not None:
+            output.close() 
\ No newline at end of file
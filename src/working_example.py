@@ -11,16 +11,14 @@ retrieving and printing the generated sarcastic headline.
 """
 import os
 import uuid
-import yaml
-import time
 import logging
 from dotenv import load_dotenv
-from julep import Client
+from tools.execution_waiter import ExecutionWaiter
+from tools.execution_results import describe_transitions, fetch_output
+from tools.readiness import ReadyOnce, ensure_resource
+from tools.lazy import Lazy, lazy_attributes
 
-# Setup basic logging
-logging.basicConfig(level=logging.INFO)
-
-# Initialize environment
+# Initialize environment; julep and yaml are imported on first use
 load_dotenv()
 api_key = os.getenv("JULEP_API_KEY")
 brave_api_key = os.getenv("BRAVE_API_KEY")
@@ -29,13 +27,27 @@ brave_api_key = os.getenv("BRAVE_API_KEY")
 AGENT_UUID = uuid.UUID('a1b2c3d4-1234-5678-9101-abcdef123456')
 TASK_UUID = uuid.UUID('d4c3b2a1-4321-8765-1098-fedcba654321')
 
-# Create Julep client
-client = Client(api_key=api_key, environment="dev", timeout=30)
+
+def _create_client():
+    from julep import Client
+
+    return Client(api_key=api_key, environment="dev", base_url=os.getenv("JULEP_BASE_URL"), timeout=30)
+
+
+# Julep client, created on first use; `working_example.client` keeps working for importers
+get_client = Lazy(_create_client)
+__getattr__ = lazy_attributes(__name__, client=get_client)
+
+# Adaptive poller shared by all executions in this process
+waiter = ExecutionWaiter(timeout=90)
+
+# Log (truncated) full transition histories; set by --debug-transitions
+debug_transitions = False
 
 
 def create_agent():
     """Create or update the agent."""
-    agent = client.agents.create_or_update(
+    agent = get_client().agents.create_or_update(
         agent_id=AGENT_UUID,
         name="Chad",
         about="Sarcastic news headline reporter.",
@@ -50,6 +62,8 @@ def create_agent():
 
 def create_task():
     """Create or update the task."""
+    import yaml
+
     task_def = yaml.safe_load(f"""
     name: Sarcasm Headline Generator
     tools:
@@ -86,7 +100,7 @@ def create_task():
           Here are the search results: {{{{_}}}}
       unwrap: true
     """)
-    task = client.tasks.create_or_update(
+    task = get_client().tasks.create_or_update(
         task_id=TASK_UUID,
         agent_id=AGENT_UUID,
         **task_def
@@ -96,31 +110,21 @@ def create_task():
 
 
 def ensure_agent_and_task_ready():
-    """Ensure agent/task exist before execution."""
-    try:
-        client.agents.get(AGENT_UUID)
-    except Exception as e:
-        if "not found" in str(e).lower():
-            create_agent()
-            time.sleep(5)
-        else:
-            raise
-
-    # Add task validation
-    try:
-        client.tasks.get(TASK_UUID)
-    except Exception as e:
-        if "not found" in str(e).lower():
-            create_task()
-            time.sleep(5)
-        else:
-            raise
+    """Ensure agent/task exist before execution; missing ones are created and polled until registered."""
+    client = get_client()
+    ensure_resource(client.agents.get, AGENT_UUID, create_agent)
+    ensure_resource(client.tasks.get, TASK_UUID, create_task)
+
+
+# Checked for the first topic only
+ensure_ready = ReadyOnce(ensure_agent_and_task_ready)
 
 
 def generate_headline(topic):
     """Generate a sarcastic headline for the given topic."""
-    # Ensure the agent and task are present and ready
-    ensure_agent_and_task_ready()
+    # Ensure the agent and task are present and ready (once per process)
+    ensure_ready()
+    client = get_client()
 
     # Create an execution instance
     execution = client.executions.create(
@@ -129,30 +133,24 @@ def generate_headline(topic):
     )
     logging.info("Execution started (ID: %s) for topic: %s", execution.id, topic)
 
-    # Wait for execution to complete with a timeout
-    max_retries = 20
-    retries = 0
-    while True:
-        execution = client.executions.get(execution.id)
-        logging.info("Execution status: %s (Retry %d/%d)", execution.status, retries, max_retries)
-        if execution.status in ["completed", "succeeded", "failed", "cancelled", "expired"]:
-            break
-        if retries >= max_retries:
-            raise RuntimeError(f"Timeout after {max_retries} retries. Final status: {execution.status}")
-        time.sleep(3)
-        retries += 1
+    # Wait for execution to complete with adaptive backoff until the deadline
+    def log_status(current, attempt):
+        logging.info("Execution status: %s (Check %d)", current.status, attempt)
+
+    execution = waiter.wait(client.executions.get, execution.id, on_poll=log_status)
 
     logging.info("Final execution status: %s", execution.status)
 
-    # Retrieve and log transitions for debugging
-    transitions = client.executions.transitions.list(execution_id=execution.id).items
-    if transitions:
+    # Full transition history only on request; outputs are truncated
+    if debug_transitions:
+        transitions = client.executions.transitions.list(execution_id=execution.id).items
         logging.info("Found %d transitions", len(transitions))
-        for i, t in enumerate(transitions):
-            logging.info("Transition %d: Type: %s, Output: %s", i, t.type, t.output)
+        for line in describe_transitions(transitions):
+            logging.info(line)
 
-    if transitions and transitions[0].output:
-        return transitions[0].output
+    output = fetch_output(client, execution)
+    if output:
+        return output
     return "No output generated"
 
 
@@ -162,7 +160,13 @@ if __name__ == "__main__":
     # Setup command-line interface
     parser = argparse.ArgumentParser(description='Generate sarcastic news headlines')
     parser.add_argument('topics', nargs='+', help='Topics for headline generation')
+    parser.add_argument('--debug-transitions', action='store_true',
+                        help="Log every execution's transitions (outputs truncated)")
     args = parser.parse_args()
+    debug_transitions = args.debug_transitions
+
+    # Setup basic logging
+    logging.basicConfig(level=logging.INFO)
 
     # Optionally create/update the agent/task once; they will be reused in generate_headline
     create_agent()
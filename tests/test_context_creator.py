@@ -0,0 +1,59 @@
+# This file checks that pruning blacklisted directories in utils/context_creator.py selects
+# the same files as filtering every file with PurePath.match, as the script used to do.
+
+import importlib.util
+import pathlib
+
+spec = importlib.util.spec_from_file_location(
+    "context_creator", pathlib.Path(__file__).parent.parent / "utils" / "context_creator.py"
+)
+context_creator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(context_creator)
+
+BLACKLIST = ["*/venv/*", "*__pycache__*", "blog_automation.egg-info", "test_*", "*.log"]
+
+
+def make_tree(root: pathlib.Path):
+    for name in [
+        "pkg/module.py",
+        "pkg/test_module.py",
+        "pkg/run.log",
+        "pkg/test_utils/__init__.py",
+        "pkg/test_utils/helpers.py",
+        "pkg/venv/activate",
+        "pkg/blog_automation.egg-info/PKG-INFO",
+    ]:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x")
+
+
+def select(root: pathlib.Path, prune: bool):
+    blacklist = context_creator.PathMatcher(BLACKLIST)
+    prune_dir = context_creator.PathMatcher.for_directories(BLACKLIST) if prune else None
+    selected = []
+    for entry in context_creator.iter_files(root, 2, prune_dir=prune_dir):
+        path = pathlib.Path(entry.path)
+        if not prune and any(path.match(pattern) for pattern in BLACKLIST):
+            continue
+        if prune and blacklist(context_creator._posix(entry.path)):
+            continue
+        selected.append(path.relative_to(root).as_posix())
+    return selected
+
+
+def test_pruning_keeps_the_historical_selection(tmp_path):
+    make_tree(tmp_path)
+    before = select(tmp_path, prune=False)
+    after = select(tmp_path, prune=True)
+    assert after == before
+    assert "pkg/test_utils/helpers.py" in after
+
+
+def test_only_directory_patterns_prune():
+    prune_dir = context_creator.PathMatcher.for_directories(BLACKLIST + ["build/"])
+    assert prune_dir("root/pkg/venv")
+    assert prune_dir("root/pkg/build")
+    assert prune_dir("root/pkg/blog_automation.egg-info")
+    assert not prune_dir("root/pkg/test_utils")
+    assert not prune_dir("root/pkg/logs.log")
@@ -0,0 +1,75 @@
+# This file tests the shared polling loop of tools/execution_watcher.py against an
+# in-memory fake of the Julep executions API.
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from tools.execution_waiter import ExecutionWaiter
+from tools.execution_watcher import ExecutionWatcher
+
+
+class FakeExecutions:
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.transitions = SimpleNamespace(list=self._transitions)
+
+    async def get(self, execution_id):
+        return SimpleNamespace(id=execution_id, status=self.statuses[execution_id], output={"ok": True})
+
+    async def _transitions(self, **kwargs):
+        return SimpleNamespace(items=[])
+
+
+def make_watcher(statuses):
+    client = SimpleNamespace(executions=FakeExecutions(statuses))
+    waiter = ExecutionWaiter(timeout=2.0, initial_interval=0.01, max_interval=0.02, jitter=0)
+    return ExecutionWatcher(client, waiter=waiter, min_interval=0.01)
+
+
+def test_failing_callback_fails_only_its_execution():
+    statuses = {"a": "running", "b": "running"}
+    watcher = make_watcher(statuses)
+
+    async def scenario():
+        failing = watcher.watch("a", on_poll=lambda execution, checks: 1 / 0)
+        other = watcher.watch("b")
+        with pytest.raises(ZeroDivisionError):
+            await asyncio.wait_for(failing, 1.0)
+        statuses["b"] = "succeeded"
+        execution, transitions = await asyncio.wait_for(other, 1.0)
+        assert execution.status == "succeeded"
+
+    asyncio.run(scenario())
+
+
+def test_failing_stop_if_fails_its_execution():
+    watcher = make_watcher({"a": "awaiting_input"})
+
+    def stop_if(execution):
+        raise AttributeError("tool_calls")
+
+    async def scenario():
+        future = watcher.watch("a", stop_statuses={"awaiting_input"}, stop_if=stop_if)
+        with pytest.raises(AttributeError):
+            await asyncio.wait_for(future, 1.0)
+
+    asyncio.run(scenario())
+
+
+def test_crashed_loop_fails_every_pending_execution():
+    watcher = make_watcher({"a": "running", "b": "running"})
+
+    async def broken_refresh(due):
+        raise RuntimeError("boom")
+
+    watcher._refresh = broken_refresh
+
+    async def scenario():
+        futures = [watcher.watch("a"), watcher.watch("b")]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="boom"):
+                await asyncio.wait_for(future, 1.0)
+
+    asyncio.run(scenario())
@@ -0,0 +1,89 @@
+# This file tests the requires_action handling of julep_jina.py against a fake Julep client:
+# the tool calls of one round are answered with a single submission, and a status that is
+# still requires_action right after that submission is not answered a second time.
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import julep_jina
+from tools.execution_waiter import ExecutionWaiter
+from tools.execution_watcher import ExecutionWatcher
+
+
+def tool_call(call_id, url):
+    return SimpleNamespace(
+        id=call_id,
+        function=SimpleNamespace(name="fetch_web_content", arguments=repr({"url": url})),
+    )
+
+
+class FakeExecutions:
+    def __init__(self, stale_polls=3, can_submit=True, has_tool_calls=True):
+        self.calls = [tool_call("call-1", "https://example.com/a"), tool_call("call-2", "https://example.com/b")]
+        self.stale_polls = stale_polls
+        self.has_tool_calls = has_tool_calls
+        self.submissions = []
+        self.lock = threading.Lock()
+        if can_submit:
+            self.submit_tool_outputs = self._submit_tool_outputs
+
+    def create(self, task_id, input):
+        return SimpleNamespace(id="execution-1", status="queued")
+
+    def get(self, execution_id):
+        with self.lock:
+            if not self.submissions:
+                if not self.has_tool_calls:
+                    return SimpleNamespace(id=execution_id, status="requires_action", output=None)
+                return SimpleNamespace(id=execution_id, status="requires_action", tool_calls=self.calls, output=None)
+            if self.stale_polls > 0:
+                # The server has not caught up with the submission yet
+                self.stale_polls -= 1
+                return SimpleNamespace(id=execution_id, status="requires_action", tool_calls=self.calls, output=None)
+            return SimpleNamespace(id=execution_id, status="succeeded", output="summary")
+
+    def _submit_tool_outputs(self, execution_id, outputs):
+        with self.lock:
+            self.submissions.append(outputs)
+
+
+@pytest.fixture
+def fake_julep(monkeypatch):
+    def install(**kwargs):
+        executions = FakeExecutions(**kwargs)
+        client = SimpleNamespace(executions=executions)
+        waiter = ExecutionWaiter(timeout=5.0, initial_interval=0.01, max_interval=0.02, jitter=0)
+        watcher = ExecutionWatcher(client, waiter=waiter, min_interval=0.01)
+        monkeypatch.setattr(julep_jina, "get_client", lambda: client)
+        monkeypatch.setattr(julep_jina, "get_watcher", lambda: watcher)
+        monkeypatch.setattr(julep_jina, "fetch_content_with_jina", lambda url: f"content of {url}")
+        return executions
+
+    return install
+
+
+def test_tool_calls_are_submitted_once(fake_julep):
+    executions = fake_julep(stale_polls=3)
+
+    assert julep_jina.process_url_with_julep("https://example.com") == "summary"
+    # The stale requires_action polls were seen, and not answered again
+    assert executions.stale_polls == 0
+    assert len(executions.submissions) == 1
+    assert [output["tool_call_id"] for output in executions.submissions[0]] == ["call-1", "call-2"]
+
+
+def test_missing_tool_output_submission_fails_fast(fake_julep):
+    executions = fake_julep(can_submit=False)
+
+    with pytest.raises(RuntimeError, match="cannot submit tool outputs"):
+        julep_jina.process_url_with_julep("https://example.com")
+    assert executions.submissions == []
+
+
+def test_execution_without_tool_calls_fails_fast(fake_julep):
+    fake_julep(has_tool_calls=False)
+
+    with pytest.raises(RuntimeError, match="cannot read its tool calls"):
+        julep_jina.process_url_with_julep("https://example.com")
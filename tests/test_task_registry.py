@@ -0,0 +1,43 @@
+# This file tests that tools/task_registry.py records uploads per Julep endpoint.
+
+import asyncio
+from types import SimpleNamespace
+
+from tools.task_registry import TaskRegistry
+
+
+def make_client(base_url, uploads):
+    async def create_or_update(**kwargs):
+        uploads.append((base_url, kwargs["task_id"]))
+
+    return SimpleNamespace(base_url=base_url, tasks=SimpleNamespace(create_or_update=create_or_update))
+
+
+def test_uploads_are_recorded_per_endpoint(tmp_path):
+    state_path = tmp_path / ".task_registry.json"
+    uploads = []
+    task_defs = {"search": {"main": []}}
+
+    async def scenario():
+        stub = TaskRegistry(make_client("http://127.0.0.1:8080/", uploads), "agent", state_path)
+        assert await stub.sync(task_defs) == ["search"]
+        stub = TaskRegistry(make_client("http://127.0.0.1:8080", uploads), "agent", state_path)
+        assert await stub.sync(task_defs) == []
+        production = TaskRegistry(make_client("https://api.julep.ai/api", uploads), "agent", state_path)
+        assert await production.sync(task_defs) == ["search"]
+
+    asyncio.run(scenario())
+    assert len(uploads) == 2
+
+
+def test_single_upload_is_persisted(tmp_path):
+    state_path = tmp_path / ".task_registry.json"
+    uploads = []
+    client = make_client("https://api.julep.ai/api", uploads)
+
+    async def scenario():
+        await TaskRegistry(client, "agent", state_path).upload("search", {"main": []})
+        assert await TaskRegistry(client, "agent", state_path).sync({"search": {"main": []}}) == []
+
+    asyncio.run(scenario())
+    assert len(uploads) == 1
@@ -0,0 +1,239 @@
+# This file defines an on-disk HTTP response cache for fetched page contents.
+# Bodies are stored zlib-compressed in SQLite together with their response metadata.
+# Fresh entries are served without any network call; stale entries are revalidated with
+# ETag / Last-Modified when the upstream provided them. Total size is kept under a byte
+# budget by evicting the least recently used entries.
+
+import asyncio
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+class ContentCache:
+    def __init__(self, path: Path, max_bytes: int = 256 * 1024 * 1024, ttl: float = 6 * 3600):
+        """
+        Args:
+            path: SQLite database file; parent directories are created if needed.
+            max_bytes: Budget for the compressed bodies; LRU entries are evicted beyond it.
+            ttl: Seconds an entry is served without revalidation.
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS content_cache (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS content_cache_accessed ON content_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached entry for a URL, or None.
+
+        The entry contains 'body', 'etag', 'last_modified', 'content_type', 'fetched_at'
+        and 'fresh' (True while within the TTL).
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, content_type, fetched_at FROM content_cache WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE content_cache SET accessed_at = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+        body, etag, last_modified, content_type, fetched_at = row
+        return {
+            "body": zlib.decompress(body).decode("utf-8"),
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": content_type,
+            "fetched_at": fetched_at,
+            "fresh": now - fetched_at <= self.ttl,
+        }
+
+    def store(self, url: str, body: str, etag: Optional[str] = None,
+              last_modified: Optional[str] = None, content_type: Optional[str] = None):
+        """Stores a response body and evicts LRU entries beyond the byte budget."""
+        raw = body.encode("utf-8")
+        compressed = zlib.compress(raw, 6)
+        if len(compressed) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO content_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, compressed, len(compressed), len(raw), etag, last_modified, content_type, now, now),
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM content_cache").fetchone()[0]
+            if total > self.max_bytes:
+                for old_url, size in self._conn.execute(
+                    "SELECT url, size FROM content_cache WHERE url != ? ORDER BY accessed_at", (url,)
+                ).fetchall():
+                    self._conn.execute("DELETE FROM content_cache WHERE url = ?", (old_url,))
+                    self.evictions += 1
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+            self._conn.commit()
+
+    def count(self, counter: str):
+        """Increments 'hits', 'revalidated' or 'misses'; safe to call from many threads."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def mark_fresh(self, url: str):
+        """Restarts the TTL of an entry after a successful revalidation."""
+        with self._lock:
+            self._conn.execute("UPDATE content_cache SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    @staticmethod
+    def validators(entry: Dict[str, Any]) -> Dict[str, str]:
+        """Conditional request headers for revalidating an entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache counters and current size."""
+        with self._lock:
+            entries, size, raw_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(raw_size), 0) FROM content_cache"
+            ).fetchone()
+            counters = (self.hits, self.revalidated, self.misses, self.evictions)
+        hits, revalidated, misses, evictions = counters
+        return {
+            "hits": hits,
+            "revalidated": revalidated,
+            "misses": misses,
+            "evictions": evictions,
+            "entries": entries,
+            "bytes": size,
+            "raw_bytes": raw_size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (
+            f"Content cache: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+            f"{stats['misses']} misses, {stats['evictions']} evictions, {stats['entries']} entries, "
+            f"{stats['bytes'] / 1024:.0f} KiB of {stats['max_bytes'] / 1024:.0f} KiB"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def cached_get(cache: ContentCache, get: Callable[..., Any], url: str, **kwargs) -> str:
+    """
+    Fetches a URL through the cache with a requests-style `get` callable.
+
+    Fresh entries are returned without a request; stale entries are revalidated with
+    conditional headers and reused on a 304 Not Modified.
+
+    Args:
+        cache: Cache to read from and write to.
+        get: `requests.get` or `Session.get`.
+        url: URL to fetch; also the cache key.
+        **kwargs: Passed through to `get` (headers are merged with the validators).
+
+    Returns:
+        The response body as text.
+    """
+    entry = cache.lookup(url)
+    if entry is not None and entry["fresh"]:
+        cache.count("hits")
+        return entry["body"]
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry is not None:
+        headers.update(cache.validators(entry))
+    response = get(url, headers=headers, **kwargs)
+
+    if entry is not None and response.status_code == 304:
+        cache.count("revalidated")
+        cache.mark_fresh(url)
+        return entry["body"]
+
+    response.raise_for_status()
+    cache.count("misses")
+    cache.store(
+        url,
+        response.text,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        content_type=response.headers.get("Content-Type"),
+    )
+    return response.text
+
+
+async def acached_get(cache: ContentCache, session: Any, url: str, **kwargs) -> str:
+    """
+    Same as cached_get for an aiohttp ClientSession. The SQLite work runs in a thread so
+    the event loop is never blocked by it.
+
+    Args:
+        cache: Cache to read from and write to.
+        session: aiohttp ClientSession.
+        url: URL to fetch; also the cache key.
+        **kwargs: Passed through to `session.get` (headers are merged with the validators).
+
+    Returns:
+        The response body as text.
+    """
+    entry = await asyncio.to_thread(cache.lookup, url)
+    if entry is not None and entry["fresh"]:
+        cache.count("hits")
+        return entry["body"]
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry is not None:
+        headers.update(cache.validators(entry))
+    async with session.get(url, headers=headers, **kwargs) as response:
+        if entry is not None and response.status == 304:
+            cache.count("revalidated")
+            await asyncio.to_thread(cache.mark_fresh, url)
+            return entry["body"]
+
+        response.raise_for_status()
+        text = await response.text()
+        cache.count("misses")
+        await asyncio.to_thread(
+            cache.store,
+            url,
+            text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            content_type=response.headers.get("Content-Type"),
+        )
+    return text
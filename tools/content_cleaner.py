@@ -1,29 +1,367 @@
-from bs4 import BeautifulSoup
-import lxml
+# This file cleans scraped HTML pages down to their visible text.
+# The default engine walks the tree directly with lxml; BeautifulSoup is kept as a fallback
+# (and as an explicit engine). Pages can be spread across a process pool for large batches.
+# The "main" mode keeps only the article body: blocks are scored readability-style by text
+# and link density, and lines that were stripped as page chrome on many pages of the same
+# domain are also dropped from the main text.
+# Run `python tools/content_cleaner.py --benchmark` to compare pages/sec of both engines.
+
+import argparse
+import hashlib
+import re
 import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from urllib.parse import urlsplit
+
+import lxml.html
+from lxml import etree
+
+try:
+    from tools.tracing import tracer
+except ImportError:
+    # Run as a script (python tools/content_cleaner.py); tracing.py sits next to it
+    from tracing import tracer
+
+ENGINES = ("lxml", "bs4")
+MODES = ("text", "main")
+
+# Elements that never hold article content
+_BOILERPLATE_TAGS = ("nav", "header", "footer", "aside", "form", "noscript", "iframe", "svg", "button")
+# class/id fragments of typical page chrome (readability's "unlikely candidates")
+_UNLIKELY = re.compile(
+    r"cookie|consent|banner|related|footer|header|nav|menu|sidebar|share|social|"
+    r"subscribe|newsletter|promo|advert|sponsor|comment|breadcrumb|popup|modal",
+    re.IGNORECASE,
+)
+# ...unless the same marker also suggests content
+_MAYBE_CONTENT = re.compile(r"article|body|content|main|story|post|entry", re.IGNORECASE)
+_PARAGRAPH_TAGS = ("p", "pre", "td", "blockquote")
+_BLOCK_TAGS = ("p", "pre", "td", "blockquote", "li", "ul", "ol", "div", "section", "table",
+               "h1", "h2", "h3", "h4", "h5", "h6")
+
+def _strip_invisible(tree):
+    """
+    Removes script/style elements, comments and processing instructions in place. Each is
+    replaced by an empty <span> holding its tail, so the text before and after it stays
+    two separate text nodes (etree.strip_elements would merge them into one).
+    """
+    for element in list(tree.iter(etree.Comment, etree.ProcessingInstruction, "script", "style")):
+        parent = element.getparent()
+        if parent is None:
+            continue
+        marker = etree.Element("span")
+        marker.tail = element.tail
+        parent.replace(element, marker)
+
+def _text_lxml(html: str) -> str:
+    """
+    Fast path: strips invisible nodes and joins the remaining text nodes, one per line;
+    the same text as BeautifulSoup's get_text(separator='\n', strip=True).
+    """
+    if not html.strip():
+        return ""
+    tree = lxml.html.fromstring(html)
+    _strip_invisible(tree)
+    return "\n".join(text.strip() for text in tree.itertext() if text.strip())
+
+def _text_bs4(html: str) -> str:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'lxml')
+    # Remove script and style tags
+    for script in soup(["script", "style"]):
+        script.extract()
+
+    # Get text
+    return soup.get_text(separator='\n', strip=True)
+
+def _element_text(element) -> str:
+    return " ".join(text.strip() for text in element.itertext() if text.strip())
+
+def _link_density(element, text_length: int) -> float:
+    if not text_length:
+        return 1.0
+    link_length = sum(len(_element_text(link)) for link in element.iter("a"))
+    return min(1.0, link_length / text_length)
+
+def _fingerprint(line: str) -> str:
+    return hashlib.blake2b(" ".join(line.lower().split()).encode("utf-8"), digest_size=8).hexdigest()
+
+def _main_text_lxml(html: str) -> tuple:
+    """
+    Extracts the main content of a page.
+
+    Returns:
+        A (main_text, full_text) tuple; full_text is what the "text" mode would return.
+    """
+    full_text = _text_lxml(html)
+    if not full_text:
+        return "", ""
+    tree = lxml.html.fromstring(html)
+    _strip_invisible(tree)
+
+    # Drop page chrome before scoring
+    for element in list(tree.iter(*_BOILERPLATE_TAGS)):
+        element.drop_tree()
+    for element in list(tree.iter()):
+        if element.tag in ("html", "body", "article", "main") or not isinstance(element.tag, str):
+            continue
+        marker = f"{element.get('class', '')} {element.get('id', '')}"
+        if (marker.strip() and _UNLIKELY.search(marker) and not _MAYBE_CONTENT.search(marker)
+                and element.getparent() is not None):
+            element.drop_tree()
+
+    # Paragraph-like blocks vote for their parent (fully) and grandparent (half)
+    scores = defaultdict(float)
+    for paragraph in tree.iter(*_PARAGRAPH_TAGS):
+        text = _element_text(paragraph)
+        if len(text) < 25:
+            continue
+        score = 1 + text.count(",") + min(len(text) / 100, 3)
+        parent = paragraph.getparent()
+        if parent is not None:
+            scores[parent] += score
+            grandparent = parent.getparent()
+            if grandparent is not None:
+                scores[grandparent] += score / 2
+
+    if not scores:
+        return full_text, full_text
+
+    # Link-heavy containers (menus, link lists) lose most of their score
+    best = max(scores, key=lambda el: scores[el] * (1 - _link_density(el, len(_element_text(el)))))
+
+    # Inside the winner, drop link lists and tiny blocks that are mostly links
+    for block in list(best.iter(*_BLOCK_TAGS)):
+        if block is best or block.getparent() is None:
+            continue
+        text_length = len(_element_text(block))
+        if text_length and _link_density(block, text_length) > 0.5:
+            block.drop_tree()
 
-def clean_html(scraped_content):
+    main_text = "\n".join(text.strip() for text in best.itertext() if text.strip())
+    return main_text, full_text
+
+def _chrome_fingerprints(main_text: str, full_text: str) -> list:
+    """Fingerprints of the lines of the full text that did not make it into the main text."""
+    main = {_fingerprint(line) for line in main_text.split("\n") if line.strip()}
+    return sorted({_fingerprint(line) for line in full_text.split("\n") if line.strip()} - main)
+
+class _DomainState:
+    __slots__ = ("pages", "page_count", "lines")
+
+    def __init__(self):
+        self.pages = OrderedDict()   # URLs already observed (bounded, oldest first)
+        self.page_count = 0
+        self.lines = OrderedDict()   # chrome line fingerprint -> pages it was seen on
+
+class BoilerplateCache:
+    def __init__(self, min_pages: int = 3, min_share: float = 0.5, max_domains: int = 256,
+                 max_pages: int = 1000, max_lines: int = 5000):
+        """
+        Per-domain fingerprints of page chrome (the lines stripped from a page's main
+        content), used to drop the same chrome when it slips into the main text of other
+        pages. Text that only ever appears inside main content (a shared headline or
+        quote) is never learned, so it is never removed. All state is bounded: least
+        recently used domains, pages and lines are evicted beyond the limits.
+
+        Args:
+            min_pages: A line must have been chrome on at least this many pages of a domain...
+            min_share: ...and on at least this share of the domain's observed pages.
+            max_domains: Domains kept.
+            max_pages: URLs remembered per domain (to count each page once).
+            max_lines: Fingerprints kept per domain.
+        """
+        self.min_pages = min_pages
+        self.min_share = min_share
+        self.max_domains = max_domains
+        self.max_pages = max_pages
+        self.max_lines = max_lines
+        self._domains = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _domain(self, url: str, create: bool):
+        domain = urlsplit(url).netloc.lower()
+        state = self._domains.get(domain)
+        if state is None:
+            if not create:
+                return None
+            state = self._domains[domain] = _DomainState()
+            while len(self._domains) > self.max_domains:
+                self._domains.popitem(last=False)
+        self._domains.move_to_end(domain)
+        return state
+
+    def observe(self, url: str, chrome_fingerprints):
+        """Records the chrome lines of a page; each page is only counted once."""
+        with self._lock:
+            state = self._domain(url, create=True)
+            if url in state.pages:
+                return
+            state.pages[url] = None
+            if len(state.pages) > self.max_pages:
+                state.pages.popitem(last=False)
+            state.page_count += 1
+            for fingerprint in set(chrome_fingerprints):
+                state.lines[fingerprint] = state.lines.pop(fingerprint, 0) + 1
+            while len(state.lines) > self.max_lines:
+                state.lines.popitem(last=False)
+
+    def filter(self, url: str, text: str) -> str:
+        """Removes lines that were chrome on at least `min_pages` pages and `min_share` of the domain."""
+        with self._lock:
+            state = self._domain(url, create=False)
+            if state is None or not state.lines:
+                return text
+            threshold = max(self.min_pages, self.min_share * state.page_count)
+            return "\n".join(
+                line for line in text.split("\n")
+                if state.lines.get(_fingerprint(line), 0) < threshold
+            )
+
+# Opt-in cache shared across calls (pass boilerplate=default_boilerplate_cache), so chrome
+# learned from earlier batches keeps being removed; by default every call learns from its own batch
+default_boilerplate_cache = BoilerplateCache()
+
+def clean_page(item: dict, engine: str = "lxml", mode: str = "text") -> dict:
+    """
+    Cleans a single page.
+
+    Args:
+        item: A dictionary containing 'url' and 'html_content'.
+        engine: "lxml" (falls back to BeautifulSoup on parser errors) or "bs4".
+        mode: "text" for all visible text, "main" for the main content only (lxml engine).
+
+    Returns:
+        A dictionary containing 'url' and 'text'; in "main" mode also 'full_text_bytes'
+        (size of the visible text) and 'text_bytes'.
+
+    Raises:
+        ValueError: If "main" mode is asked for with the bs4 engine.
+    """
+    if mode == "main" and engine != "lxml":
+        raise ValueError("The 'main' mode is only implemented for the lxml engine")
+    try:
+        if mode == "main":
+            try:
+                text, full_text = _main_text_lxml(item['html_content'])
+            except (etree.ParserError, ValueError):
+                text = full_text = _text_bs4(item['html_content'])
+            return {
+                "url": item['url'],
+                "text": text,
+                "full_text_bytes": len(full_text.encode("utf-8")),
+                "text_bytes": len(text.encode("utf-8")),
+                "chrome_fingerprints": _chrome_fingerprints(text, full_text),
+            }
+        if engine == "lxml":
+            try:
+                text = _text_lxml(item['html_content'])
+            except (etree.ParserError, ValueError):
+                text = _text_bs4(item['html_content'])
+        else:
+            text = _text_bs4(item['html_content'])
+        return {"url": item['url'], "text": text}
+    except Exception as e:
+        print(f"Error cleaning HTML for {item['url']}: {e}", file=sys.stderr)
+        return {"url": item['url'], "text": ""}
+
+def clean_html(scraped_content, engine: str = "lxml", workers: int = None, chunksize: int = 4,
+               mode: str = "text", boilerplate: BoilerplateCache = None):
     """
     Cleans HTML content and extracts the main text.
 
     Args:
         scraped_content: A list of dictionaries, each containing 'url' and 'html_content'.
+        engine: "lxml" (default fast path) or "bs4"; "main" mode requires "lxml".
+        workers: Number of worker processes; None or 1 cleans in the current process.
+        chunksize: Pages handed to a worker at a time in parallel mode.
+        mode: "text" keeps all visible text; "main" keeps only the main content and drops
+            lines repeated across pages of the same domain.
+        boilerplate: Fingerprint cache used in "main" mode. Defaults to a new cache for
+            this call; pass one (e.g. default_boilerplate_cache) to learn across calls.
 
     Returns:
-        A list of dictionaries, each containing 'url' and 'text'.
-    """
-    cleaned_content = []
-    for item in scraped_content:
-        try:
-            soup = BeautifulSoup(item['html_content'], 'lxml')
-            # Remove script and style tags
-            for script in soup(["script", "style"]):
-                script.extract()
-
-            # Get text
-            text = soup.get_text(separator='\n', strip=True)
-            cleaned_content.append({"url": item['url'], "text": text})
-        except Exception as e:
-            print(f"Error cleaning HTML for {item['url']}: {e}", file=sys.stderr)
-            cleaned_content.append({"url": item['url'], "text": ""})
-    return cleaned_content 
\ No newline at end of file
+        A list of dictionaries, each containing 'url' and 'text'. In "main" mode each also
+        has 'full_text_bytes', 'text_bytes' and 'bytes_removed'.
+
+    Raises:
+        ValueError: For an unknown engine or mode, or "main" mode with the bs4 engine.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine}; expected one of {', '.join(ENGINES)}")
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode}; expected one of {', '.join(MODES)}")
+    if mode == "main" and engine != "lxml":
+        raise ValueError("The 'main' mode is only implemented for the lxml engine")
+
+    with tracer.span("clean", pages=len(scraped_content), engine=engine, mode=mode, workers=workers or 1):
+        if workers and workers > 1 and len(scraped_content) > 1:
+            # Only ship what the workers need across the process boundary
+            pages = [{"url": item['url'], "html_content": item['html_content']} for item in scraped_content]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                cleaned = list(pool.map(partial(clean_page, engine=engine, mode=mode), pages, chunksize=chunksize))
+        else:
+            cleaned = [clean_page(item, engine, mode) for item in scraped_content]
+
+        if mode == "main":
+            # Boilerplate fingerprints need every page of the batch, so they run in this process
+            with tracer.span("clean.boilerplate"):
+                boilerplate = boilerplate if boilerplate is not None else BoilerplateCache()
+                for page in cleaned:
+                    boilerplate.observe(page["url"], page.pop("chrome_fingerprints", ()))
+                for page in cleaned:
+                    page["text"] = boilerplate.filter(page["url"], page["text"])
+                    page["text_bytes"] = len(page["text"].encode("utf-8"))
+                    page["bytes_removed"] = page.get("full_text_bytes", 0) - page["text_bytes"]
+
+    return cleaned
+
+def _synthetic_pages(count: int, paragraphs: int = 60) -> list:
+    body = "".join(
+        f"<div class='c'><h2>Section {i}</h2><p>Paragraph {i} with <a href='/l{i}'>a link</a> "
+        f"and some <b>bold</b> text that goes on for a while to look like an article.</p></div>"
+        for i in range(paragraphs)
+    )
+    page = (
+        "<html><head><title>Bench</title><style>body{color:red}</style>"
+        "<script>var x = 1;</script></head><body><nav>Home | News</nav>"
+        f"{body}<!-- comment --><footer>Footer</footer></body></html>"
+    )
+    return [{"url": f"https://example.com/{i}", "html_content": page} for i in range(count)]
+
+def benchmark(pages: int = 200, workers: int = 4):
+    """Prints pages/sec for each engine, serial and on a process pool."""
+    content = _synthetic_pages(pages)
+    for engine in ENGINES:
+        for mode_workers in (None, workers):
+            start = time.perf_counter()
+            clean_html(content, engine=engine, workers=mode_workers)
+            elapsed = time.perf_counter() - start
+            mode = f"{mode_workers} processes" if mode_workers else "serial"
+            print(f"{engine:5s} {mode:12s} {pages / elapsed:10.1f} pages/sec ({elapsed:.2f}s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTML cleaning utilities")
+    parser.add_argument("--benchmark", action="store_true", help="Compare pages/sec of the cleaning engines")
+    parser.add_argument("--pages", type=int, default=200, help="Synthetic pages used by the benchmark")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes used by the benchmark")
+    parser.add_argument("--main", nargs="+", metavar="FILE", help="Print the main content of local HTML files")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.pages, args.workers)
+    elif args.main:
+        pages = []
+        for path in args.main:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                pages.append({"url": path, "html_content": f.read()})
+        for page in clean_html(pages, mode="main"):
+            print(f"Main content of {page['url']} ({page['bytes_removed']} bytes removed):", file=sys.stderr)
+            print(page["text"])
+    else:
+        parser.print_help()
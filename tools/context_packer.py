@@ -0,0 +1,105 @@
+# This file packs search and image results into a fixed prompt token budget.
+# Results are ranked by relevance to the topic, snippets are truncated and images capped,
+# so the size of the prompt built from them stays predictable from topic to topic.
+
+import json
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Rough average for English text with GPT-style tokenizers
+CHARS_PER_TOKEN = 4
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_OPERATOR = re.compile(r"\b(?:site|inurl|intitle|filetype):\S+", re.IGNORECASE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "will with about after what when how why who".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (no tokenizer download needed)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def topic_terms(topic: str) -> List[str]:
+    """Keywords of a search query, without operators such as site:."""
+    words = _WORD.findall(_OPERATOR.sub(" ", topic).lower())
+    return [w for w in words if w not in _STOPWORDS and w != "or" and len(w) > 1]
+
+
+def relevance(result: Dict[str, Any], terms: Sequence[str]) -> float:
+    """Share of topic terms found in a result; title matches count double."""
+    if not terms:
+        return 0.0
+    title = set(_WORD.findall((result.get("title") or "").lower()))
+    snippet = set(_WORD.findall((result.get("snippet") or "").lower()))
+    score = sum(2 * (term in title) + (term in snippet) for term in terms)
+    return score / (3 * len(terms))
+
+
+def _truncate(text: str, max_tokens: int) -> Tuple[str, bool]:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text, False
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return cut + "...", True
+
+
+def pack_context(
+    search_results: Sequence[Dict[str, Any]],
+    image_results: Sequence[Dict[str, Any]],
+    topic: str,
+    token_budget: int = 1500,
+    max_snippet_tokens: int = 80,
+    max_images: int = 3,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Selects and trims results so their serialized form fits a token budget.
+
+    Args:
+        search_results: Organic results with 'title', 'snippet' and 'link'.
+        image_results: Image results with 'title', 'imageUrl' and 'link'.
+        topic: Search query the results belong to.
+        token_budget: Estimated tokens available for results and images together.
+        max_snippet_tokens: Snippets longer than this are truncated.
+        max_images: Maximum number of images kept.
+
+    Returns:
+        The packed search results (most relevant first), the packed images and a report
+        with 'budget', 'used', 'results_in', 'results_kept', 'images_kept' and 'truncated'.
+    """
+    used = 0
+
+    # Images first: the prompt needs at least one, and they are small
+    images = []
+    for image in list(image_results)[:max_images]:
+        entry = {"title": image.get("title"), "imageUrl": image.get("imageUrl"), "link": image.get("link")}
+        cost = estimate_tokens(json.dumps(entry))
+        if images and used + cost > token_budget:
+            break
+        images.append(entry)
+        used += cost
+
+    terms = topic_terms(topic)
+    ranked = sorted(enumerate(search_results), key=lambda pair: (-relevance(pair[1], terms), pair[0]))
+    results, truncated = [], 0
+    for _, result in ranked:
+        snippet, was_truncated = _truncate(result.get("snippet") or "", max_snippet_tokens)
+        entry = {"title": result.get("title"), "snippet": snippet, "link": result.get("link")}
+        cost = estimate_tokens(json.dumps(entry))
+        if used + cost > token_budget:
+            continue
+        results.append(entry)
+        used += cost
+        truncated += was_truncated
+
+    report = {
+        "budget": token_budget,
+        "used": used,
+        "results_in": len(search_results),
+        "results_kept": len(results),
+        "images_kept": len(images),
+        "truncated": truncated,
+    }
+    return results, images, report
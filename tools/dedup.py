@@ -0,0 +1,166 @@
+# This file removes near-duplicate documents (e.g. the same wire story syndicated by
+# several outlets) before they are sent to the LLM.
+# Documents are reduced to MinHash signatures of their word shingles and bucketed with
+# locality-sensitive hashing, so only documents sharing a bucket are compared and the
+# cost grows sub-quadratically with the number of documents. Each cluster of near
+# duplicates keeps its best-ranked member.
+
+import random
+import re
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Set, Tuple
+from urllib.parse import urlsplit
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def shingles(text: str, size: int = 3) -> Set[int]:
+    """Hashed word n-grams of a text."""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        """
+        Args:
+            num_perm: Signature length; more permutations give better similarity estimates.
+            seed: Seed for the hash permutations, so signatures are reproducible.
+        """
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, features: Iterable[int]) -> Tuple[int, ...]:
+        features = list(features)
+        if not features:
+            return tuple([_MERSENNE_PRIME] * self.num_perm)
+        return tuple(
+            min((a * x + b) % _MERSENNE_PRIME for x in features)
+            for a, b in self._perms
+        )
+
+
+def estimated_similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the documents behind two signatures."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class LSHIndex:
+    def __init__(self, bands: int = 16, rows: int = 4):
+        """
+        Args:
+            bands: Number of signature bands; each band is hashed into its own buckets.
+            rows: Signature values per band. bands * rows must equal the signature length.
+        """
+        self.bands = bands
+        self.rows = rows
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(bands)]
+
+    def insert(self, key: int, signature: Sequence[int]) -> Set[int]:
+        """Adds a signature and returns the keys already sharing at least one bucket with it."""
+        candidates: Set[int] = set()
+        for band in range(self.bands):
+            chunk = tuple(signature[band * self.rows:(band + 1) * self.rows])
+            bucket = self._buckets[band].setdefault(chunk, [])
+            candidates.update(bucket)
+            bucket.append(key)
+        return candidates
+
+
+def deduplicate(
+    items: Sequence[Any],
+    text_of: Callable[[Any], str],
+    rank_of: Callable[[Any], Any],
+    threshold: float = 0.7,
+    num_perm: int = 64,
+    bands: int = 16,
+) -> Tuple[List[Any], Dict[str, int]]:
+    """
+    Drops near-duplicate items, keeping the best-ranked member of every cluster.
+
+    Args:
+        items: Documents to deduplicate.
+        text_of: Returns the text compared for an item.
+        rank_of: Sort key of an item; the lowest value in a cluster is kept.
+        threshold: Estimated Jaccard similarity above which two items are duplicates.
+        num_perm: MinHash signature length.
+        bands: Number of LSH bands (num_perm must be divisible by it).
+
+    Returns:
+        The kept items in their original order, and a report with 'input', 'kept',
+        'dropped' and 'chars_dropped'.
+    """
+    if num_perm % bands:
+        raise ValueError("num_perm must be divisible by bands")
+    hasher = MinHasher(num_perm)
+    index = LSHIndex(bands, num_perm // bands)
+    parent = list(range(len(items)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    signatures = []
+    for i, item in enumerate(items):
+        signature = hasher.signature(shingles(text_of(item)))
+        signatures.append(signature)
+        for j in index.insert(i, signature):
+            if estimated_similarity(signature, signatures[j]) >= threshold:
+                parent[find(i)] = find(j)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(items)):
+        clusters.setdefault(find(i), []).append(i)
+    keep = {min(members, key=lambda i: (rank_of(items[i]), i)) for members in clusters.values()}
+
+    kept = [item for i, item in enumerate(items) if i in keep]
+    dropped = [item for i, item in enumerate(items) if i not in keep]
+    report = {
+        "input": len(items),
+        "kept": len(kept),
+        "dropped": len(dropped),
+        "chars_dropped": sum(len(text_of(item)) for item in dropped),
+    }
+    return kept, report
+
+
+def _domain(url: str) -> str:
+    domain = urlsplit(url or "").netloc.lower()
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def deduplicate_search_results(
+    results: Sequence[Dict[str, Any]], sources: Sequence[str] = (), threshold: float = 0.7
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Deduplicates Serper organic results (or scraped pages with a 'link'/'url' and 'text').
+
+    Within a cluster the result from the earliest entry of `sources` wins, then the
+    best search position, then the longest text.
+    """
+    authority = {_domain(source): rank for rank, source in enumerate(sources)}
+
+    def text_of(result: Dict[str, Any]) -> str:
+        return result.get("text") or f"{result.get('title', '')} {result.get('snippet', '')}"
+
+    def rank_of(result: Dict[str, Any]):
+        domain = _domain(result.get("link") or result.get("url"))
+        return (
+            authority.get(domain, len(authority)),
+            result.get("position", float("inf")),
+            -len(text_of(result)),
+        )
+
+    return deduplicate(results, text_of, rank_of, threshold=threshold)
@@ -0,0 +1,71 @@
+# This file retrieves the result of a finished Julep execution with as little traffic as
+# possible. A succeeded execution usually carries its output itself; otherwise only the
+# newest transition (the finish transition) is requested instead of the whole history.
+# Full transition dumps are meant for debugging only and are truncated.
+
+import json
+from typing import Any, Iterable, List, Optional
+
+from tools.execution_waiter import call_maybe_async
+
+# Query asking for the newest transition only
+LATEST_TRANSITION = {"limit": 1, "direction": "desc", "sort_by": "created_at"}
+
+# Characters of a transition output shown in debug dumps
+DEBUG_OUTPUT_CHARS = 300
+
+
+def execution_output(execution: Any, transitions: Iterable[Any] = ()) -> Optional[Any]:
+    """
+    Output of a finished execution: its own 'output' when set, else the output of the
+    newest finish transition (or of the newest transition if none is marked finish).
+
+    Args:
+        execution: Finished execution.
+        transitions: Transitions already fetched for it, newest first.
+    """
+    output = getattr(execution, "output", None)
+    if output is not None:
+        return output
+    transitions = list(transitions)
+    for transition in transitions:
+        if getattr(transition, "type", None) == "finish":
+            return transition.output
+    return transitions[0].output if transitions else None
+
+
+def fetch_output(client, execution: Any) -> Optional[Any]:
+    """Synchronous result retrieval for a finished execution (at most one small list call)."""
+    output = getattr(execution, "output", None)
+    if output is not None:
+        return output
+    page = client.executions.transitions.list(execution_id=execution.id, **LATEST_TRANSITION)
+    return execution_output(execution, page.items)
+
+
+async def afetch_output(client, execution: Any) -> Optional[Any]:
+    """Same as fetch_output for sync or async clients, without blocking the event loop."""
+    output = getattr(execution, "output", None)
+    if output is not None:
+        return output
+    page = await call_maybe_async(
+        client.executions.transitions.list, execution_id=execution.id, **LATEST_TRANSITION
+    )
+    return execution_output(execution, page.items)
+
+
+def truncate_output(value: Any, limit: int = DEBUG_OUTPUT_CHARS) -> str:
+    """Compact one-line preview of a transition output."""
+    text = value if isinstance(value, str) else json.dumps(value, default=str, ensure_ascii=False)
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text)} chars)"
+
+
+def describe_transitions(transitions: Iterable[Any], limit: int = DEBUG_OUTPUT_CHARS) -> List[str]:
+    """One debug line per transition, with truncated outputs."""
+    return [
+        f"Transition {i}: Type: {t.type}, Output: {truncate_output(t.output, limit)}"
+        for i, t in enumerate(transitions)
+    ]
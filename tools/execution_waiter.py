@@ -0,0 +1,143 @@
+# This file defines a reusable waiter for Julep executions.
+# It polls with adaptive backoff: quick first checks, then exponential growth with jitter,
+# bounded by a deadline rather than a retry count. It works from sync and async code.
+
+import asyncio
+import functools
+import inspect
+import random
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+# Statuses after which an execution will not change anymore
+TERMINAL_STATUSES = frozenset({"completed", "succeeded", "failed", "cancelled", "expired"})
+
+
+class ExecutionTimeoutError(TimeoutError):
+    """Raised when an execution does not reach a stop status before the deadline."""
+
+    def __init__(self, execution_id: Any, status: Optional[str], elapsed: float):
+        super().__init__(
+            f"Execution {execution_id} still '{status}' after {elapsed:.1f}s"
+        )
+        self.execution_id = execution_id
+        self.status = status
+        self.elapsed = elapsed
+
+
+async def call_maybe_async(fn: Callable, *args, **kwargs) -> Any:
+    """
+    Calls `fn` from async code without blocking the event loop.
+
+    Coroutine functions are awaited directly; plain functions are run in the
+    loop's default thread pool. Awaitable results (such as the async SDK's
+    paginators) are awaited as well.
+    """
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class ExecutionWaiter:
+    def __init__(
+        self,
+        timeout: float = 120.0,
+        initial_interval: float = 0.25,
+        max_interval: float = 5.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.2,
+    ):
+        """
+        Args:
+            timeout: Seconds to wait before giving up.
+            initial_interval: Delay before the first status check.
+            max_interval: Upper bound for the delay between two checks.
+            multiplier: Growth factor applied to the delay after every check.
+            jitter: Relative random spread applied to each delay (0.2 means +/-20%).
+        """
+        self.timeout = timeout
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def delays(self) -> Iterator[float]:
+        """Yields the successive delays between two status checks."""
+        interval = self.initial_interval
+        while True:
+            yield interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            interval = min(interval * self.multiplier, self.max_interval)
+
+    def wait(
+        self,
+        fetch: Callable[[Any], Any],
+        execution_id: Any,
+        stop_statuses: Iterable[str] = TERMINAL_STATUSES,
+        on_poll: Optional[Callable[[Any, int], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Blocks until the execution reaches one of `stop_statuses`.
+
+        Args:
+            fetch: Callable returning the execution for an ID (e.g. `client.executions.get`).
+            execution_id: ID of the execution to wait for.
+            stop_statuses: Statuses that end the wait.
+            on_poll: Optional callback invoked with (execution, check_number) after every check.
+            timeout: Overrides the waiter's default timeout.
+
+        Returns:
+            The execution object in its stop status.
+
+        Raises:
+            ExecutionTimeoutError: If the deadline passes first.
+        """
+        stop_statuses = frozenset(stop_statuses)
+        start = time.monotonic()
+        deadline = start + (self.timeout if timeout is None else timeout)
+        status = None
+        for attempt, delay in enumerate(self.delays(), start=1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ExecutionTimeoutError(execution_id, status, time.monotonic() - start)
+            time.sleep(min(delay, remaining))
+
+            execution = fetch(execution_id)
+            status = execution.status
+            if on_poll:
+                on_poll(execution, attempt)
+            if status in stop_statuses:
+                return execution
+
+    async def wait_async(
+        self,
+        fetch: Callable[[Any], Any],
+        execution_id: Any,
+        stop_statuses: Iterable[str] = TERMINAL_STATUSES,
+        on_poll: Optional[Callable[[Any, int], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Async variant of `wait`. `fetch` may be a coroutine function or a plain
+        blocking function, which is then run in a worker thread.
+        """
+        stop_statuses = frozenset(stop_statuses)
+        start = time.monotonic()
+        deadline = start + (self.timeout if timeout is None else timeout)
+        status = None
+        for attempt, delay in enumerate(self.delays(), start=1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ExecutionTimeoutError(execution_id, status, time.monotonic() - start)
+            await asyncio.sleep(min(delay, remaining))
+
+            execution = await call_maybe_async(fetch, execution_id)
+            status = execution.status
+            if on_poll:
+                on_poll(execution, attempt)
+            if status in stop_statuses:
+                return execution
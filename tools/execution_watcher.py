@@ -0,0 +1,298 @@
+# This file defines a multiplexed watcher for many in-flight Julep executions.
+# A single background loop keeps a registry of pending execution IDs and refreshes the
+# ones that are due in batches: one `executions.list` call per task when several of its
+# executions are pending, otherwise a bounded number of concurrent `executions.get` calls.
+# API calls per second therefore depend on the polling interval, not on how many
+# executions are being waited for. Finished executions only cost an extra call when their
+# output is missing (newest transition only) or when the full history is requested.
+
+import asyncio
+import concurrent.futures
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from tools.execution_waiter import (
+    TERMINAL_STATUSES,
+    ExecutionTimeoutError,
+    ExecutionWaiter,
+    call_maybe_async,
+)
+from tools.execution_results import LATEST_TRANSITION
+from tools.tracing import tracer
+
+# Statuses after which the transitions are worth fetching
+SUCCESS_STATUSES = frozenset({"completed", "succeeded"})
+
+
+class _Pending:
+    """Book-keeping for one execution in the registry."""
+
+    def __init__(self, execution_id, task_id, future, delays, stop_statuses, deadline, on_poll, history=False,
+                 stop_if=None):
+        self.execution_id = str(execution_id)
+        self.task_id = str(task_id) if task_id is not None else None
+        self.future = future
+        self.delays = delays
+        self.stop_statuses = stop_statuses
+        self.start = time.monotonic()
+        self.deadline = deadline
+        self.on_poll = on_poll
+        self.history = history
+        self.stop_if = stop_if
+        self.checks = 0
+        self.status = None
+        self.next_due = self.start + next(delays)
+
+
+class ExecutionWatcher:
+    def __init__(
+        self,
+        client,
+        waiter: Optional[ExecutionWaiter] = None,
+        min_interval: float = 0.25,
+        max_batch: int = 10,
+        list_limit: int = 50,
+    ):
+        """
+        Args:
+            client: Julep client (sync or async) used for `executions.get/list` and transitions.
+            waiter: Supplies the per-execution backoff schedule and default timeout.
+            min_interval: Minimum delay between two refresh rounds.
+            max_batch: Maximum number of `executions.get` calls issued per round.
+            list_limit: Page size used when refreshing a task's executions with one list call.
+        """
+        self.client = client
+        self.waiter = waiter or ExecutionWaiter()
+        self.min_interval = min_interval
+        self.max_batch = max_batch
+        self.list_limit = list_limit
+        self.api_calls = 0
+        self._is_async = inspect.iscoroutinefunction(client.executions.get)
+        self._pending: Dict[str, _Pending] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._thread_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_lock = threading.Lock()
+
+    def watch(
+        self,
+        execution_id: Any,
+        task_id: Any = None,
+        stop_statuses: Iterable[str] = TERMINAL_STATUSES,
+        timeout: Optional[float] = None,
+        on_poll: Optional[Callable[[Any, int], None]] = None,
+        history: bool = False,
+        stop_if: Optional[Callable[[Any], bool]] = None,
+    ) -> "asyncio.Future[Tuple[Any, List[Any]]]":
+        """
+        Registers an execution and returns a future for its outcome. Must be called
+        from the event loop the watcher runs on.
+
+        Args:
+            execution_id: ID of the execution to watch.
+            task_id: Task the execution belongs to; enables batched list refreshes.
+            stop_statuses: Statuses that resolve the future.
+            timeout: Overrides the waiter's default timeout.
+            on_poll: Optional callback invoked with (execution, check_number) after every check.
+            history: Fetch the full transition history of successful executions (for
+                debugging and tracing) instead of the minimum needed for the result.
+            stop_if: Optional extra check for an execution in a stop status; while it
+                returns False the execution keeps being polled (e.g. a requires_action
+                status whose tool calls were already answered).
+
+        Returns:
+            A future resolving to (execution, transitions), newest transition first. For
+            successful executions without history, transitions is empty when the execution
+            carries its output and holds only the newest transition otherwise; it is always
+            empty for unsuccessful ones. Use execution_results.execution_output for the result.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        timeout = self.waiter.timeout if timeout is None else timeout
+        entry = _Pending(
+            execution_id,
+            task_id,
+            future,
+            self.waiter.delays(),
+            frozenset(stop_statuses),
+            time.monotonic() + timeout,
+            on_poll,
+            history,
+            stop_if,
+        )
+        self._pending[entry.execution_id] = entry
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            # The loop serves every caller, so its spans must not nest under the first one
+            self._task = tracer.detached().run(loop.create_task, self._run())
+        else:
+            # Let the running loop pick up the new, earlier due time
+            self._wakeup.set()
+        return future
+
+    def watch_threadsafe(self, execution_id: Any, **kwargs) -> concurrent.futures.Future:
+        """
+        Same as `watch`, for synchronous callers. The watcher runs on a private event
+        loop in a daemon thread; the returned future can be waited on with `.result()`.
+        """
+        with self._thread_lock:
+            if self._thread_loop is None:
+                self._thread_loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._thread_loop.run_forever,
+                    name="execution-watcher",
+                    daemon=True,
+                ).start()
+
+        async def register():
+            return await self.watch(execution_id, **kwargs)
+
+        return asyncio.run_coroutine_threadsafe(register(), self._thread_loop)
+
+    async def _call(self, name: str, fn: Callable, *args, **kwargs):
+        self.api_calls += 1
+        with tracer.span(f"julep.{name}"):
+            if self._is_async:
+                # Async client: every method returns a coroutine or an awaitable paginator
+                return await fn(*args, **kwargs)
+            return await call_maybe_async(fn, *args, **kwargs)
+
+    async def _run(self):
+        try:
+            await self._poll_until_idle()
+        except Exception as e:
+            # Whatever ends the loop early must not leave the remaining callers waiting forever;
+            # they receive the error, and the next watch() starts a new loop
+            for entry in list(self._pending.values()):
+                self._finish(entry, exception=e)
+        finally:
+            # Cancelled (e.g. at loop shutdown)
+            for entry in list(self._pending.values()):
+                self._finish(entry, exception=RuntimeError("Execution watcher stopped"))
+
+    async def _poll_until_idle(self):
+        last_round = 0.0
+        while self._pending:
+            now = time.monotonic()
+            wake_at = max(min(e.next_due for e in self._pending.values()), last_round + self.min_interval)
+            if wake_at > now:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wake_at - now)
+                    # A new execution was registered; recompute the next wake-up time
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+
+            last_round = time.monotonic()
+            self._drop_cancelled()
+            due = [e for e in self._pending.values() if e.next_due <= last_round]
+            for entry in due:
+                if last_round >= entry.deadline:
+                    self._finish(entry, exception=ExecutionTimeoutError(
+                        entry.execution_id, entry.status, last_round - entry.start))
+            due = [e for e in due if e.execution_id in self._pending]
+            if due:
+                with tracer.span("watcher.refresh", due=len(due), pending=len(self._pending)):
+                    await self._refresh(due)
+
+    def _drop_cancelled(self):
+        for execution_id, entry in list(self._pending.items()):
+            if entry.future.done():
+                del self._pending[execution_id]
+
+    async def _refresh(self, due: List[_Pending]):
+        refreshed: Dict[str, Any] = {}
+
+        # One list call per task covers all of its pending executions
+        by_task: Dict[str, List[_Pending]] = {}
+        for entry in due:
+            if entry.task_id is not None:
+                by_task.setdefault(entry.task_id, []).append(entry)
+        list_fn = getattr(self.client.executions, "list", None)
+        if list_fn is not None:
+            for task_id, entries in by_task.items():
+                if len(entries) < 2:
+                    continue
+                try:
+                    page = await self._call(
+                        "executions.list",
+                        list_fn,
+                        task_id=task_id,
+                        limit=max(self.list_limit, len(entries)),
+                        sort_by="created_at",
+                        direction="desc",
+                    )
+                except Exception:
+                    # Fall back to individual gets for this task
+                    continue
+                wanted = {e.execution_id for e in entries}
+                for execution in page.items:
+                    if str(execution.id) in wanted:
+                        refreshed[str(execution.id)] = execution
+
+        # Bounded pool of gets for everything the list calls did not cover
+        missing = sorted((e for e in due if e.execution_id not in refreshed), key=lambda e: e.next_due)
+        batch = missing[:self.max_batch]
+        results = await asyncio.gather(
+            *(self._call("executions.get", self.client.executions.get, e.execution_id) for e in batch),
+            return_exceptions=True,
+        )
+        for entry, result in zip(batch, results):
+            if isinstance(result, Exception):
+                self._finish(entry, exception=result)
+            else:
+                refreshed[entry.execution_id] = result
+
+        finished = []
+        now = time.monotonic()
+        for entry in due:
+            execution = refreshed.get(entry.execution_id)
+            if execution is None or entry.execution_id not in self._pending:
+                continue
+            entry.checks += 1
+            entry.status = execution.status
+            try:
+                if entry.on_poll:
+                    entry.on_poll(execution, entry.checks)
+                stop = execution.status in entry.stop_statuses and (
+                    entry.stop_if is None or entry.stop_if(execution))
+            except Exception as e:
+                # A failing callback only fails the execution it was given for
+                self._finish(entry, exception=e)
+                continue
+            if stop:
+                finished.append((entry, execution))
+            else:
+                entry.next_due = now + next(entry.delays)
+
+        await asyncio.gather(*(self._complete(entry, execution) for entry, execution in finished))
+
+    async def _complete(self, entry: _Pending, execution):
+        transitions = []
+        try:
+            if execution.status in SUCCESS_STATUSES and (entry.history or getattr(execution, "output", None) is None):
+                query = {"direction": "desc", "sort_by": "created_at"} if entry.history else LATEST_TRANSITION
+                page = await self._call(
+                    "executions.transitions.list",
+                    self.client.executions.transitions.list,
+                    execution_id=entry.execution_id,
+                    **query,
+                )
+                transitions = page.items
+        except Exception as e:
+            self._finish(entry, exception=e)
+            return
+        self._finish(entry, result=(execution, transitions))
+
+    def _finish(self, entry: _Pending, result=None, exception: Optional[BaseException] = None):
+        self._pending.pop(entry.execution_id, None)
+        if entry.future.done():
+            return
+        if exception is not None:
+            entry.future.set_exception(exception)
+        else:
+            entry.future.set_result(result)
@@ -1,8 +1,14 @@
+import asyncio
+import time
 import requests
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional
+from tools.content_cache import ContentCache, acached_get, cached_get
+from tools.tracing import tracer
 
 class JinaReaderAPI:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, pool_size: int = 20, cache: Optional[ContentCache] = None):
         self.base_url = "https://r.jina.ai/"
         self.headers = {
             "Accept": "text/plain",
@@ -11,6 +17,27 @@ class JinaReaderAPI:
         if api_key:
             self.headers["Authorization"] = f"Bearer {api_key}"
 
+        # Optional on-disk response cache used by read_url / read_urls / aread_urls
+        self.cache = cache
+
+        # Persistent keep-alive session shared by all calls (and threads) of this instance
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self) -> "JinaReaderAPI":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Closes the pooled connections"""
+        self.session.close()
+
     def read_url(self, url: str, timeout: int = 30) -> str:
         """
         Convert a URL to LLM-friendly text using Jina Reader API
@@ -21,13 +48,15 @@ class JinaReaderAPI:
             Clean text content of the webpage
         """
         try:
-            response = requests.get(
-                f"{self.base_url}{url}",
-                headers=self.headers,
-                timeout=timeout
-            )
-            response.raise_for_status()
-            return response.text
+            with tracer.span("jina.read_url", url=url):
+                if self.cache is not None:
+                    return cached_get(self.cache, self.session.get, f"{self.base_url}{url}", timeout=timeout)
+                response = self.session.get(
+                    f"{self.base_url}{url}",
+                    timeout=timeout
+                )
+                response.raise_for_status()
+                return response.text
         except requests.exceptions.HTTPError as e:
             print(f"HTTP Error: {e.response.status_code} - {e.response.text}")
             raise
@@ -39,10 +68,79 @@ class JinaReaderAPI:
         """
         Alternative POST method implementation
         """
-        response = requests.post(
+        response = self.session.post(
             self.base_url,
-            headers=self.headers,
             json={"url": url},
             timeout=timeout
         )
-        return response.text 
\ No newline at end of file
+        return response.text
+
+    def _timed_read(self, url: str, timeout: int) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            text, error = self.read_url(url, timeout=timeout), None
+        except Exception as e:
+            text, error = "", str(e)
+        return {"url": url, "text": text, "elapsed": time.perf_counter() - start, "error": error}
+
+    def read_urls(self, urls: Iterable[str], max_concurrency: int = 8, timeout: int = 30) -> Iterator[Dict[str, Any]]:
+        """
+        Reads many URLs concurrently on a thread pool sharing the pooled session
+        Args:
+            urls: Target URLs to process
+            max_concurrency: Maximum number of requests in flight
+            timeout: Per-request timeout in seconds
+        Yields:
+            Dictionaries with 'url', 'text', 'elapsed' (seconds) and 'error' (None on success),
+            in completion order
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, self.pool_size))) as executor:
+            futures = [executor.submit(self._timed_read, url, timeout) for url in urls]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    async def aread_urls(self, urls: Iterable[str], max_concurrency: int = 8, timeout: int = 30) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async variant of read_urls built on a single aiohttp session; uses the cache like read_url
+        Args:
+            urls: Target URLs to process
+            max_concurrency: Maximum number of requests in flight
+            timeout: Per-request timeout in seconds
+        Yields:
+            Dictionaries with 'url', 'text', 'elapsed' (seconds) and 'error' (None on success),
+            in completion order
+        """
+        import aiohttp
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        connector = aiohttp.TCPConnector(limit=max_concurrency, keepalive_timeout=30)
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=client_timeout) as session:
+            async def fetch(url: str) -> Dict[str, Any]:
+                async with semaphore:
+                    start = time.perf_counter()
+                    try:
+                        with tracer.span("jina.read_url", url=url):
+                            if self.cache is not None:
+                                text = await acached_get(self.cache, session, f"{self.base_url}{url}")
+                            else:
+                                async with session.get(f"{self.base_url}{url}") as response:
+                                    response.raise_for_status()
+                                    text = await response.text()
+                        error = None
+                    except Exception as e:
+                        text, error = "", str(e) or type(e).__name__
+                    return {"url": url, "text": text, "elapsed": time.perf_counter() - start, "error": error}
+
+            tasks = [asyncio.ensure_future(fetch(url)) for url in urls]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
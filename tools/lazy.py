@@ -0,0 +1,53 @@
+# This file defers expensive module-level objects (Julep clients, watchers, caches) until
+# they are first used, so the command-line scripts import and print --help quickly and
+# short-lived invocations only pay for what they touch. Modules keep their former global
+# names through a PEP 562 module __getattr__.
+
+import threading
+from typing import Any, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    def __init__(self, factory: Callable[[], T]):
+        """
+        A value built by `factory` on the first call and returned by every later call.
+        Construction happens once, also when the first calls race from many threads;
+        a factory that raises is retried on the next call.
+
+        Args:
+            factory: Builds the value.
+        """
+        self._factory = factory
+        self._value = None
+        self._built = False
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        """Whether the value exists already."""
+        return self._built
+
+    def __call__(self) -> T:
+        if self._built:
+            return self._value
+        with self._lock:
+            if not self._built:
+                self._value = self._factory()
+                self._built = True
+        return self._value
+
+
+def lazy_attributes(module_name: str, **getters: Callable[[], Any]) -> Callable[[str], Any]:
+    """
+    Builds a module `__getattr__` serving the given names from their getters, e.g.
+    `__getattr__ = lazy_attributes(__name__, client=get_client)` keeps `module.client` working.
+    """
+    def __getattr__(name: str) -> Any:
+        getter = getters.get(name)
+        if getter is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        return getter()
+
+    return __getattr__
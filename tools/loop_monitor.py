@@ -0,0 +1,56 @@
+# This file defines a small monitor that measures how long the asyncio event loop is blocked.
+# A background task sleeps for a fixed interval and records how late it wakes up; any
+# lateness is time during which some synchronous code held the loop.
+
+import asyncio
+import time
+from typing import Optional
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.01):
+        """
+        Args:
+            interval: Sampling interval in seconds; lag below this resolution is not visible.
+        """
+        self.interval = interval
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _sample(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - start - self.interval
+            self.samples += 1
+            if lag > 0:
+                self.total_lag += lag
+                self.max_lag = max(self.max_lag, lag)
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def summary(self) -> str:
+        """Returns a one-line human readable report."""
+        return (
+            f"Event loop blocked: total {self.total_lag * 1000:.1f} ms, "
+            f"max {self.max_lag * 1000:.1f} ms over {self.samples} samples"
+        )
@@ -0,0 +1,84 @@
+# This file makes sure Julep agents and tasks exist before executions are started.
+# A missing resource is created and then polled until the API returns it, instead of
+# sleeping a fixed amount of time, and the whole check runs once per process.
+
+import threading
+import time
+from typing import Any, Callable
+
+from tools.execution_waiter import ExecutionWaiter
+
+
+def is_not_found(error: BaseException) -> bool:
+    """Whether an API error means the resource does not exist."""
+    return getattr(error, "status_code", None) == 404 or "not found" in str(error).lower()
+
+
+def wait_until_visible(get: Callable[[Any], Any], resource_id: Any, timeout: float = 30.0) -> Any:
+    """
+    Polls `get(resource_id)` with backoff until it stops reporting "not found".
+
+    Returns:
+        The resource.
+
+    Raises:
+        TimeoutError: If the resource is still missing after `timeout` seconds.
+    """
+    start = time.monotonic()
+    for delay in ExecutionWaiter(timeout=timeout, initial_interval=0.1, max_interval=2.0).delays():
+        try:
+            return get(resource_id)
+        except Exception as e:
+            if not is_not_found(e):
+                raise
+        elapsed = time.monotonic() - start
+        if elapsed >= timeout:
+            raise TimeoutError(f"{resource_id} still not found after {elapsed:.1f}s")
+        time.sleep(min(delay, timeout - elapsed))
+
+
+def ensure_resource(get: Callable[[Any], Any], resource_id: Any, create: Callable[[], Any],
+                    timeout: float = 30.0) -> bool:
+    """
+    Creates a resource if it is missing and waits until the API serves it.
+
+    Args:
+        get: Fetches the resource by ID (e.g. `client.agents.get`).
+        resource_id: ID of the resource.
+        create: Creates the resource.
+        timeout: Seconds to wait for a created resource to become visible.
+
+    Returns:
+        True if the resource had to be created.
+    """
+    try:
+        get(resource_id)
+        return False
+    except Exception as e:
+        if not is_not_found(e):
+            raise
+    create()
+    wait_until_visible(get, resource_id, timeout)
+    return True
+
+
+class ReadyOnce:
+    def __init__(self, check: Callable[[], Any]):
+        """
+        Runs a readiness check at most once per process, also when called from many
+        threads at the same time. A failed check is retried on the next call.
+
+        Args:
+            check: Function raising if the resources are not ready.
+        """
+        self._check = check
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        if self._ready:
+            return
+        with self._lock:
+            if not self._ready:
+                self._check()
+                self._ready = True
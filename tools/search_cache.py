@@ -0,0 +1,114 @@
+# This file defines a persistent, size-bounded TTL cache for search API results.
+# Entries live in a local SQLite database keyed by endpoint and normalized query; the
+# least recently used entries are evicted once the cache grows past its entry limit.
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def normalize_query(query: str) -> str:
+    """Lowercases a query and collapses whitespace so trivial variations share an entry."""
+    return " ".join(query.lower().split())
+
+
+class SearchCache:
+    def __init__(self, path: Path, ttl: float = 24 * 3600, max_entries: int = 1000):
+        """
+        Args:
+            path: SQLite database file; parent directories are created if needed.
+            ttl: Seconds an entry stays valid. 0 disables the cache.
+            max_entries: Number of entries kept before least recently used ones are evicted.
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS search_cache (
+                endpoint TEXT NOT NULL,
+                query TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (endpoint, query)
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS search_cache_accessed ON search_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, endpoint: str, query: str) -> Optional[Any]:
+        """Returns the cached payload, or None on a miss or an expired entry."""
+        if not self.enabled:
+            return None
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM search_cache WHERE endpoint = ? AND query = ?",
+                (endpoint, key),
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE search_cache SET accessed_at = ? WHERE endpoint = ? AND query = ?",
+                (now, endpoint, key),
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, endpoint: str, query: str, payload: Any):
+        """Stores a payload and evicts least recently used entries beyond the limit."""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?)",
+                (endpoint, normalize_query(query), json.dumps(payload), now, now),
+            )
+            # Expired entries go first, then the least recently used ones
+            self._conn.execute("DELETE FROM search_cache WHERE created_at < ?", (now - self.ttl,))
+            overflow = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    """DELETE FROM search_cache WHERE rowid IN (
+                        SELECT rowid FROM search_cache ORDER BY accessed_at LIMIT ?
+                    )""",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss/eviction counters and the current number of entries."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": entries}
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (
+            f"Search cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['evictions']} evictions, {stats['entries']} entries"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,121 @@
+# This file defines a small dependency-graph executor for async pipeline stages.
+# Each stage declares the stages it depends on; the executor starts every stage as soon
+# as all of its inputs are ready, bounded by a global concurrency limit.
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from tools.tracing import tracer
+
+StageFunc = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class StageError(RuntimeError):
+    """Raised when a stage fails; carries the name of the failing stage."""
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class StageGraph:
+    def __init__(self, max_concurrency: int = 4):
+        """
+        Args:
+            max_concurrency: Maximum number of stages running at the same time.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self._stages: Dict[str, StageFunc] = {}
+        self._deps: Dict[str, List[str]] = {}
+
+    def add_stage(self, name: str, func: StageFunc, deps: Iterable[str] = ()) -> "StageGraph":
+        """
+        Registers a stage.
+
+        Args:
+            name: Unique stage name; its result is stored under this key.
+            func: Coroutine function called with a dict of the results of its dependencies.
+            deps: Names of the stages whose results this stage needs.
+
+        Returns:
+            The graph itself, so calls can be chained.
+        """
+        if name in self._stages:
+            raise ValueError(f"Stage {name} is already defined")
+        self._stages[name] = func
+        self._deps[name] = list(deps)
+        return self
+
+    def _validate(self, provided: Iterable[str]):
+        provided = set(provided)
+        for name, deps in self._deps.items():
+            for dep in deps:
+                if dep not in self._stages and dep not in provided:
+                    raise ValueError(f"Stage {name} depends on unknown stage {dep}")
+
+        # Kahn's algorithm over stage-to-stage edges; anything left over sits on a cycle
+        remaining = {
+            name: len([dep for dep in deps if dep in self._stages and dep not in provided])
+            for name, deps in self._deps.items()
+        }
+        ready = [name for name, count in remaining.items() if count == 0]
+        visited = 0
+        while ready:
+            current = ready.pop()
+            visited += 1
+            for name, deps in self._deps.items():
+                if current in deps:
+                    remaining[name] -= 1
+                    if remaining[name] == 0:
+                        ready.append(name)
+        if visited != len(self._stages):
+            raise ValueError("Stage graph contains a cycle")
+
+    async def run(self, initial: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Runs every stage once, starting each as soon as its dependencies have finished.
+
+        Args:
+            initial: Optional precomputed results that stages may depend on by name.
+
+        Returns:
+            A dictionary mapping stage names (and initial keys) to their results.
+
+        Raises:
+            StageError: If any stage raises; all still-running stages are cancelled.
+        """
+        results: Dict[str, Any] = dict(initial or {})
+        self._validate(results)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pending = {name for name in self._stages if name not in results}
+        running: Dict[asyncio.Task, str] = {}
+
+        async def run_stage(name: str):
+            async with semaphore:
+                inputs = {dep: results[dep] for dep in self._deps[name]}
+                with tracer.span(f"stage.{name}"):
+                    return await self._stages[name](inputs)
+
+        try:
+            while pending or running:
+                for name in sorted(pending):
+                    if all(dep in results for dep in self._deps[name]):
+                        pending.discard(name)
+                        running[asyncio.ensure_future(run_stage(name))] = name
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    if task.exception() is not None:
+                        raise StageError(name, task.exception()) from task.exception()
+                    results[name] = task.result()
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        return results
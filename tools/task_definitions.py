@@ -0,0 +1,154 @@
+# This file loads Julep task definitions from YAML files once and caches the parsed trees,
+# in memory for the process and on disk across runs. Entries are keyed by file path and
+# validated by mtime/size, then by content hash, so unchanged files are never re-parsed.
+# Cached trees keep their placeholders (e.g. <SERPER_API_KEY>); secrets are injected into
+# a copy of the tree after loading and never reach the cache file.
+
+import copy
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+CACHE_VERSION = 1
+
+
+def yaml_loader():
+    """libyaml's CSafeLoader when PyYAML was built with it, else the pure-Python SafeLoader."""
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def inject_placeholders(tree: Any, values: Dict[str, Optional[str]]) -> Any:
+    """
+    Returns a copy of a parsed definition with placeholders replaced inside string values
+    (mapping keys are left alone). Placeholders whose value is None are kept as they are.
+    """
+    values = {placeholder: value for placeholder, value in values.items() if value is not None}
+    if not values:
+        return copy.deepcopy(tree)
+
+    def inject(node):
+        if isinstance(node, dict):
+            return {key: inject(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [inject(value) for value in node]
+        if isinstance(node, str):
+            for placeholder, value in values.items():
+                if placeholder in node:
+                    node = node.replace(placeholder, value)
+        return node
+
+    return inject(tree)
+
+
+class TaskDefinitionCache:
+    # Parsed definitions shared by every instance of the process, by resolved file path
+    _memory: Dict[str, Dict[str, Any]] = {}
+    _memory_lock = threading.Lock()
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: JSON file persisting parsed definitions across runs; None keeps them
+                in memory only. Parent directories are created if needed.
+        """
+        self.path = Path(path) if path is not None else None
+        self.hits = 0
+        self.misses = 0
+        self._disk = self._read() if self.path is not None else {}
+        self._dirty = False
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def _lookup(self, key: str, stat) -> Optional[Dict[str, Any]]:
+        """Entry for a file whose mtime and size are unchanged, from memory or disk."""
+        for entries in (self._memory, self._disk):
+            entry = entries.get(key)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                return entry
+        return None
+
+    def load(self, yaml_file: Path) -> Any:
+        """
+        Parsed definition of a YAML file, placeholders included. The returned tree is
+        shared; callers must copy it before changing it (inject_placeholders does).
+        """
+        yaml_file = Path(yaml_file)
+        key = str(yaml_file.resolve())
+        stat = yaml_file.stat()
+        entry = self._lookup(key, stat)
+        if entry is None:
+            raw = yaml_file.read_bytes()
+            digest = hashlib.sha256(raw).hexdigest()
+            known = self._memory.get(key) or self._disk.get(key)
+            if known and known["sha256"] == digest:
+                # Touched but unchanged
+                definition = known["definition"]
+                self.hits += 1
+            else:
+                import yaml
+
+                definition = yaml.load(raw.decode("utf-8"), Loader=yaml_loader())
+                self.misses += 1
+            entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest, "definition": definition}
+            self._store(key, entry)
+        else:
+            self.hits += 1
+            if key not in self._memory:
+                with self._memory_lock:
+                    self._memory[key] = entry
+        return entry["definition"]
+
+    def _store(self, key: str, entry: Dict[str, Any]):
+        with self._memory_lock:
+            self._memory[key] = entry
+        if self.path is None:
+            return
+        # Only trees that survive a JSON round trip unchanged are persisted (YAML dates or
+        # non-string keys would come back different)
+        try:
+            persisted = json.loads(json.dumps(entry["definition"]))
+        except (TypeError, ValueError):
+            persisted = None
+        if persisted == entry["definition"]:
+            self._disk[key] = entry
+            self._dirty = True
+        else:
+            logging.debug(f"Task definition {key} kept in memory only (not JSON serializable)")
+
+    def load_all(self, tasks_dir: Path, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Parsed definitions of `tasks_dir/<name>.yaml` by name; all YAML files when names is None.
+
+        Raises:
+            FileNotFoundError: If a requested task has no YAML file.
+        """
+        tasks_dir = Path(tasks_dir)
+        if names is None:
+            files = sorted(tasks_dir.glob("*.yaml"))
+        else:
+            files = [tasks_dir / f"{name}.yaml" for name in names]
+        definitions = {yaml_file.stem: self.load(yaml_file) for yaml_file in files}
+        self.save()
+        return definitions
+
+    def save(self):
+        """Writes the disk cache if it changed."""
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"version": CACHE_VERSION, "files": self._disk}), encoding="utf-8")
+        tmp_path.replace(self.path)
+        self._dirty = False
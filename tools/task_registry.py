@@ -0,0 +1,135 @@
+# This file defines a registry that maps task YAMLs to stable Julep task IDs.
+# Each task gets a deterministic uuid5 derived from the agent ID and the task name, and a
+# content hash of its definition is stored locally so a task is only uploaded when it changed.
+# Hashes are recorded per Julep endpoint (base URL), since the same task IDs are used against
+# every environment and an upload to one of them says nothing about the others.
+
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tools.execution_waiter import call_maybe_async
+from tools.tracing import tracer
+
+STATE_VERSION = 2
+
+
+def task_uuid(agent_id: str, task_name: str) -> str:
+    """Deterministic task ID for an agent/task name pair."""
+    try:
+        namespace = uuid.UUID(str(agent_id))
+    except ValueError:
+        namespace = uuid.uuid5(uuid.NAMESPACE_URL, str(agent_id))
+    return str(uuid.uuid5(namespace, task_name))
+
+
+def content_hash(task_def: Dict[str, Any]) -> str:
+    """Stable hash of a parsed task definition."""
+    canonical = json.dumps(task_def, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class TaskRegistry:
+    def __init__(self, client, agent_id: str, state_path: Path, endpoint: Optional[str] = None):
+        """
+        Args:
+            client: Julep client (sync or async) used for `tasks.create_or_update`.
+            agent_id: Agent the tasks belong to.
+            state_path: JSON file storing the hash of the last uploaded version of each task.
+            endpoint: Julep environment the tasks are uploaded to; defaults to the client's
+                base URL. Uploads recorded for other endpoints are not trusted.
+        """
+        self.client = client
+        self.agent_id = str(agent_id)
+        self.state_path = Path(state_path)
+        if endpoint is None:
+            endpoint = str(getattr(client, "base_url", "") or "")
+        self.endpoint = endpoint.rstrip("/")
+        self._state = self._load_state()
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {"version": STATE_VERSION, "endpoints": {}}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable task registry {self.state_path}: {e}")
+            return {"version": STATE_VERSION, "endpoints": {}}
+        if state.get("version") != STATE_VERSION:
+            # Older files do not say which environment their uploads went to
+            return {"version": STATE_VERSION, "endpoints": {}}
+        return state
+
+    def _save_state(self):
+        tmp_path = self.state_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._state, indent=2, sort_keys=True), encoding="utf-8")
+        tmp_path.replace(self.state_path)
+
+    def _known(self) -> Dict[str, Dict[str, str]]:
+        """Recorded uploads of this agent's tasks to this endpoint, by task name."""
+        endpoints = self._state["endpoints"]
+        return endpoints.setdefault(self.endpoint, {}).setdefault(self.agent_id, {})
+
+    def task_id(self, task_name: str) -> str:
+        """Returns the stable Julep task ID for a task name."""
+        return task_uuid(self.agent_id, task_name)
+
+    async def upload(self, task_name: str, task_def: Dict[str, Any], save: bool = True):
+        """
+        Uploads a task unconditionally and records its hash.
+
+        Args:
+            task_name: Name the task ID is derived from.
+            task_def: Parsed task definition.
+            save: Write the state file afterwards (sync saves once for a whole batch).
+        """
+        task_id = self.task_id(task_name)
+        with tracer.span("julep.tasks.create_or_update", task=task_name):
+            await call_maybe_async(
+                self.client.tasks.create_or_update,
+                task_id=task_id,
+                agent_id=self.agent_id,
+                **task_def,
+            )
+        self._known()[task_name] = {
+            "task_id": task_id,
+            "hash": content_hash(task_def),
+        }
+        if save:
+            self._save_state()
+
+    async def sync(self, task_defs: Dict[str, Dict[str, Any]]) -> List[str]:
+        """
+        Uploads, in parallel, every task whose definition differs from the last upload.
+
+        Args:
+            task_defs: Parsed task definitions keyed by task name.
+
+        Returns:
+            The names of the tasks that were uploaded.
+        """
+        known = self._known()
+        changed = [
+            name for name, task_def in task_defs.items()
+            if known.get(name, {}).get("hash") != content_hash(task_def)
+        ]
+        if not changed:
+            return []
+
+        results = await asyncio.gather(
+            *(self.upload(name, task_defs[name], save=False) for name in changed),
+            return_exceptions=True,
+        )
+        # Persist whatever succeeded before surfacing failures
+        self._save_state()
+        for name, result in zip(changed, results):
+            if isinstance(result, Exception):
+                logging.error(f"Failed to create/update task {name}: {str(result)}")
+                raise result
+
+        print(f"Uploaded {len(changed)} changed task(s): {', '.join(changed)}")
+        return changed
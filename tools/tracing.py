@@ -0,0 +1,283 @@
+# This file defines a lightweight tracing layer for the pipeline and the scraping tools.
+# Spans are nested through a context variable, so asyncio tasks and stages started inside a
+# span become its children automatically; every span without a parent starts a new trace
+# (e.g. one per topic or URL). Server-side Julep transitions can be folded in as child
+# spans from their timestamps. Finished spans export to JSON Lines or to the Chrome trace
+# event format (chrome://tracing, https://ui.perfetto.dev) for flame-graph viewing.
+# Tracing is off until `tracer.enable()` is called; disabled spans cost one attribute check.
+
+import contextvars
+import itertools
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_ids = itertools.count(1)
+
+
+def _epoch(value: Any) -> Optional[float]:
+    """Seconds since the epoch for a datetime or an ISO 8601 string."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value.timestamp()
+
+
+class Span:
+    def __init__(self, name: str, parent: Optional["Span"] = None, start: Optional[float] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.span_id = next(_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else self.span_id
+        self.start = time.time() if start is None else start
+        self.end: Optional[float] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.error: Optional[str] = None
+        self._perf_start = time.perf_counter()
+
+    @property
+    def duration(self) -> float:
+        return ((self.end if self.end is not None else time.time()) - self.start)
+
+    def set(self, **attributes):
+        """Adds attributes to the span."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "end": self.end,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled, so callers never need to check."""
+
+    span_id = trace_id = parent_id = None
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _SpanContext:
+    """Context manager (sync and async) that opens a span and makes it current."""
+
+    __slots__ = ("_tracer", "_name", "_attributes", "_span", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._attributes = attributes
+        self._span = None
+        self._token = None
+
+    def __enter__(self):
+        if not self._tracer.enabled:
+            return _NOOP_SPAN
+        self._span = Span(self._name, _current_span.get(), attributes=self._attributes)
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._span is None:
+            return False
+        span = self._span
+        span.end = span.start + (time.perf_counter() - span._perf_start)
+        if exc is not None:
+            span.error = f"{exc_type.__name__}: {exc}"
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Exited in another context (e.g. a generator finalized elsewhere)
+            _current_span.set(None)
+        self._tracer._record(span)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+class Tracer:
+    def __init__(self, enabled: bool = False):
+        """
+        Args:
+            enabled: Whether spans are recorded from the start.
+        """
+        self.enabled = enabled
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self._spans = []
+
+    def span(self, name: str, **attributes) -> _SpanContext:
+        """
+        Opens a span as a child of the current one; use as `with` or `async with`.
+
+        Args:
+            name: Span name, e.g. "stage.search" or "julep.executions.create".
+            **attributes: Initial attributes of the span.
+        """
+        return _SpanContext(self, name, attributes)
+
+    def current(self):
+        """The innermost open span (a no-op span while disabled or outside any span)."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _current_span.get() or _NOOP_SPAN
+
+    def detached(self) -> contextvars.Context:
+        """A copy of the current context without an open span, for long-lived background tasks."""
+        context = contextvars.copy_context()
+        context.run(_current_span.set, None)
+        return context
+
+    def record_span(self, name: str, start: float, end: float, parent: Any = None,
+                    **attributes) -> Optional[Span]:
+        """
+        Records an already finished span with explicit timestamps (seconds since the epoch).
+
+        Args:
+            name: Span name.
+            start: Start time.
+            end: End time.
+            parent: Parent span; defaults to the current span.
+            **attributes: Attributes of the span.
+        """
+        if not self.enabled:
+            return None
+        parent = parent if isinstance(parent, Span) else _current_span.get()
+        span = Span(name, parent, start=start, attributes=attributes)
+        span.end = max(start, end)
+        self._record(span)
+        return span
+
+    def add_transitions(self, execution: Any, transitions: Iterable[Any], parent: Any = None):
+        """
+        Folds a Julep execution's server-side history into the trace: one span for the
+        time spent queued and one per transition, covering the time since the previous
+        one. Timestamps come from the server clock, so small skews against local spans
+        are expected.
+
+        Args:
+            execution: Execution with 'created_at'.
+            transitions: Transitions with 'created_at', 'type' and 'current' (any order).
+            parent: Parent span; defaults to the current span.
+        """
+        if not self.enabled:
+            return
+        ordered = sorted(transitions, key=lambda t: _epoch(getattr(t, "created_at", None)) or 0)
+        previous = _epoch(getattr(execution, "created_at", None))
+        for index, transition in enumerate(ordered):
+            at = _epoch(getattr(transition, "created_at", None))
+            if at is None:
+                continue
+            if previous is None:
+                previous = at
+            current = getattr(transition, "current", None)
+            step = getattr(current, "step", None)
+            label = getattr(transition, "step_label", None) or (f"step {step}" if step is not None else "")
+            name = "julep.queued" if index == 0 else f"julep.transition.{transition.type}"
+            self.record_span(
+                name, previous, at, parent,
+                transition_type=transition.type, step=label, transition_id=str(getattr(transition, "id", "")),
+            )
+            previous = at
+
+    def _record(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def export_jsonl(self, path) -> int:
+        """Writes one JSON object per finished span; returns the number of spans."""
+        spans = sorted(self.spans(), key=lambda s: s.start)
+        with open(path, "w", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+        return len(spans)
+
+    def export_chrome(self, path) -> int:
+        """
+        Writes the Chrome trace event format. Each trace gets its own process row;
+        overlapping sibling spans are spread over thread lanes so nesting stays valid.
+        """
+        spans = sorted(self.spans(), key=lambda s: (s.start, -s.duration))
+        by_id = {span.span_id: span for span in spans}
+        lanes: Dict[int, List[List[Span]]] = {}
+        events = []
+        for span in spans:
+            ancestors = set()
+            parent_id = span.parent_id
+            while parent_id is not None and parent_id in by_id:
+                ancestors.add(parent_id)
+                parent_id = by_id[parent_id].parent_id
+            trace_lanes = lanes.setdefault(span.trace_id, [])
+            for lane, stack in enumerate(trace_lanes):
+                while stack and stack[-1].end <= span.start:
+                    stack.pop()
+                if not stack or stack[-1].span_id in ancestors:
+                    stack.append(span)
+                    break
+            else:
+                trace_lanes.append([span])
+                lane = len(trace_lanes) - 1
+            args = dict(span.attributes)
+            if span.error:
+                args["error"] = span.error
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": round(span.start * 1e6, 1),
+                "dur": round(span.duration * 1e6, 1),
+                "pid": span.trace_id,
+                "tid": lane,
+                "args": args,
+            })
+        for span in spans:
+            if span.parent_id is None:
+                label = span.attributes.get("topic") or span.attributes.get("url") or ""
+                events.append({"name": "process_name", "ph": "M", "pid": span.trace_id,
+                               "args": {"name": f"{span.name} {label[:80]}".strip()}})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        return len(spans)
+
+    def export(self, path) -> int:
+        """Exports to JSON Lines for a .jsonl path, otherwise to the Chrome trace format."""
+        if Path(path).suffix == ".jsonl":
+            return self.export_jsonl(path)
+        return self.export_chrome(path)
+
+
+# Process-wide tracer used by the pipeline and the tools
+tracer = Tracer()
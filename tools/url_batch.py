@@ -0,0 +1,45 @@
+# This file runs a per-URL function over many URLs on a thread pool and streams each
+# result as soon as its URL finishes, either to stdout or as JSON Lines to a file.
+# It backs the multi-URL command lines of julep_jina.py and src/jina_ai.py.
+
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TextIO
+
+
+def process_urls(process: Callable[[str], Any], urls: Iterable[str], workers: int = 4) -> Iterator[Dict[str, Any]]:
+    """
+    Calls `process(url)` for every URL with up to `workers` calls in flight.
+
+    Yields:
+        Dictionaries with 'url', 'result', 'error' (None on success) and 'elapsed'
+        (seconds), in completion order.
+    """
+    def run(url: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            result, error = process(url), None
+        except Exception as e:
+            logging.error(f"Error processing {url}: {e}")
+            result, error = None, str(e) or type(e).__name__
+        return {"url": url, "result": result, "error": error, "elapsed": round(time.perf_counter() - start, 3)}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(run, url) for url in urls]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def write_result(record: Dict[str, Any], output: Optional[TextIO] = None, label: str = "Result"):
+    """Writes one finished URL: a JSON line to `output`, or a readable block to stdout."""
+    if output is not None:
+        output.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+        output.flush()
+    elif record["error"] is None:
+        print(f"\nURL: {record['url']}\n{label}: {record['result']}", flush=True)
@@ -1,66 +1,244 @@
 # This file defines an asynchronous web scraper that fetches the HTML content of multiple URLs.
 # It uses the aiohttp library for making asynchronous HTTP requests.
 # The script takes a list of URLs as command-line arguments and prints the first 500 characters of each page's content.
-# It also supports setting a maximum concurrency limit using the --max-concurrent argument.
+# Concurrency is bounded globally (--max-concurrent) and per host (--per-host), and pages
+# are printed as soon as they arrive. Bodies are streamed with a size cap (--max-bytes).
 
+import argparse
 import asyncio
 import aiohttp
 from aiohttp import ClientResponseError
+import codecs
+import re
 import sys
-from urllib.parse import urljoin
+from collections import defaultdict
+from typing import AsyncIterator, Iterable, Optional
+from urllib.parse import urlsplit
 
-async def fetch_page(session: aiohttp.ClientSession, url: str) -> tuple[str, str]:
-    """Fetches a single page and returns the URL and its content."""
+try:
+    from tools.tracing import tracer
+except ImportError:
+    # Run as a script (python tools/web_scraper.py); tracing.py sits next to it
+    from tracing import tracer
+
+# Bodies larger than this are truncated; the rest of the stream is never read
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+# Content types worth reading; anything else is skipped before the body is downloaded
+DEFAULT_ALLOWED_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+CHUNK_SIZE = 64 * 1024
+# Body bytes buffered before the charset is decided (unless </head> comes first)
+SNIFF_BYTES = 4096
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+_HEAD_END = re.compile(rb"</head\s*>", re.IGNORECASE)
+
+def _valid_codec(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+def detect_encoding(header_charset: Optional[str], head: bytes) -> str:
+    """Picks the charset from the header, a BOM or a <meta> tag in the first 4 KiB, else UTF-8."""
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    encoding = _valid_codec(header_charset)
+    if encoding:
+        return encoding
+    match = _META_CHARSET.search(head[:SNIFF_BYTES])
+    if match:
+        encoding = _valid_codec(match.group(1).decode("ascii", "ignore"))
+        if encoding:
+            return encoding
+    return "utf-8"
+
+def _looks_binary(head: bytes) -> bool:
+    """Whether the start of a body without a Content-Type is binary (NUL bytes, no UTF-16 BOM)."""
+    return b"\x00" in head and not head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE))
+
+async def fetch_page(session: aiohttp.ClientSession, url: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                     allowed_types: Iterable[str] = DEFAULT_ALLOWED_TYPES) -> dict:
+    """
+    Streams a single page with bounded memory.
+
+    Args:
+        session: Session used for the request.
+        url: Page to fetch.
+        max_bytes: Body bytes read at most; longer pages are truncated.
+        allowed_types: Content types that are read; others are skipped before the body is read.
+            Responses without a Content-Type are read unless their first bytes look binary.
+
+    Returns:
+        A dictionary with 'url', 'html_content' and metadata: 'status', 'content_type' (None
+        when the response has no Content-Type),
+        'encoding', 'bytes_read', 'truncated', 'skipped' (reason or None) and 'error' (or None).
+    """
+    page = {
+        "url": url, "html_content": "", "status": None, "content_type": None, "encoding": None,
+        "bytes_read": 0, "truncated": False, "skipped": None, "error": None,
+    }
+    with tracer.span("scrape.fetch", url=url) as span:
+        await _fetch_into(page, session, url, max_bytes, allowed_types)
+        span.set(status=page["status"], bytes=page["bytes_read"], error=page["error"], skipped=page["skipped"])
+    return page
+
+async def _fetch_into(page: dict, session: aiohttp.ClientSession, url: str, max_bytes: int,
+                      allowed_types: Iterable[str]):
     try:
         async with session.get(url, timeout=10) as response:
+            page["status"] = response.status
             response.raise_for_status()
-            return url, await response.text()
+
+            # aiohttp reports a missing Content-Type as application/octet-stream; such
+            # pages are sniffed instead of skipped
+            declared = "Content-Type" in response.headers
+            page["content_type"] = response.content_type if declared else None
+            if declared and allowed_types and response.content_type not in allowed_types:
+                page["skipped"] = "content-type"
+                print(f"Skipping {url}: content type {response.content_type}", file=sys.stderr)
+                return
+
+            decoder = None
+            head = b""
+            parts = []
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                remaining = max_bytes - page["bytes_read"]
+                if len(chunk) > remaining:
+                    chunk = chunk[:remaining]
+                    page["truncated"] = True
+                page["bytes_read"] += len(chunk)
+                if decoder is None:
+                    # Chunks can be a few bytes long; buffer enough to find a <meta charset>
+                    head += chunk
+                    if len(head) < SNIFF_BYTES and not page["truncated"] and not _HEAD_END.search(head):
+                        continue
+                    decoder = _start_decoding(page, response.charset, head, declared)
+                    if decoder is None:
+                        return
+                    chunk, head = head, b""
+                parts.append(decoder.decode(chunk))
+                if page["truncated"]:
+                    print(f"Truncated {url} at {max_bytes} bytes", file=sys.stderr)
+                    break
+            if decoder is None and head:
+                # The whole body fit in the sniffing buffer
+                decoder = _start_decoding(page, response.charset, head, declared)
+                if decoder is None:
+                    return
+                parts.append(decoder.decode(head))
+            if decoder is not None:
+                parts.append(decoder.decode(b"", final=True))
+            page["html_content"] = "".join(parts)
     except ClientResponseError as e:
         print(f"Error fetching {url}: {e.status} - {e.message}", file=sys.stderr)
-        return url, ""
+        page["error"] = f"{e.status} - {e.message}"
     except asyncio.TimeoutError:
         print(f"Timeout fetching {url}", file=sys.stderr)
-        return url, ""
+        page["error"] = "timeout"
     except Exception as e:
         print(f"Error fetching {url}: {e}", file=sys.stderr)
-        return url, ""
+        page["error"] = str(e) or type(e).__name__
+
+def _start_decoding(page: dict, header_charset: Optional[str], head: bytes, declared: bool):
+    """Incremental decoder for a page given its first bytes; None (page skipped) for binary bodies."""
+    if not declared and _looks_binary(head):
+        page["skipped"] = "content-type"
+        page["truncated"] = False
+        print(f"Skipping {page['url']}: no content type and binary content", file=sys.stderr)
+        return None
+    page["encoding"] = detect_encoding(header_charset, head)
+    return codecs.getincrementaldecoder(page["encoding"])(errors="replace")
+
+def make_connector(max_concurrent: int, per_host: int) -> aiohttp.TCPConnector:
+    """Creates a connector with bounded, keep-alive connections and a DNS cache."""
+    return aiohttp.TCPConnector(
+        limit=max_concurrent,
+        limit_per_host=per_host,
+        use_dns_cache=True,
+        ttl_dns_cache=300,
+        keepalive_timeout=30,
+    )
+
+async def _scrape_indexed(urls: list[str], max_concurrent: int, per_host: int,
+                          **fetch_options) -> AsyncIterator[tuple[int, dict]]:
+    global_limit = asyncio.Semaphore(max_concurrent)
+    host_limits = defaultdict(lambda: asyncio.Semaphore(per_host))
 
-async def scrape_urls(urls: list[str]) -> list[dict]:
+    async with aiohttp.ClientSession(connector=make_connector(max_concurrent, per_host)) as session:
+        async def bounded_fetch(index: int, url: str) -> tuple[int, dict]:
+            # Wait for the host slot first so a busy host does not hold global slots
+            async with host_limits[urlsplit(url).netloc]:
+                async with global_limit:
+                    return index, await fetch_page(session, url, **fetch_options)
+
+        tasks = [asyncio.ensure_future(bounded_fetch(i, url)) for i, url in enumerate(urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+async def iter_scrape(urls: list[str], max_concurrent: int = 10, per_host: int = 2,
+                      max_bytes: int = DEFAULT_MAX_BYTES,
+                      allowed_types: Iterable[str] = DEFAULT_ALLOWED_TYPES) -> AsyncIterator[dict]:
+    """
+    Scrapes multiple URLs and yields each page as soon as it is fetched.
+
+    Args:
+        urls: A list of URLs to scrape.
+        max_concurrent: Maximum number of requests in flight overall.
+        per_host: Maximum number of requests in flight per host.
+        max_bytes: Body bytes read at most per page.
+        allowed_types: Content types that are read; others are skipped.
+
+    Yields:
+        Page dictionaries as returned by fetch_page, in completion order.
+    """
+    async for _, item in _scrape_indexed(urls, max_concurrent, per_host,
+                                         max_bytes=max_bytes, allowed_types=allowed_types):
+        yield item
+
+async def scrape_urls(urls: list[str], max_concurrent: int = 10, per_host: int = 2,
+                      max_bytes: int = DEFAULT_MAX_BYTES,
+                      allowed_types: Iterable[str] = DEFAULT_ALLOWED_TYPES) -> list[dict]:
     """
     Asynchronously scrapes multiple URLs.
 
     Args:
         urls: A list of URLs to scrape.
+        max_concurrent: Maximum number of requests in flight overall.
+        per_host: Maximum number of requests in flight per host.
+        max_bytes: Body bytes read at most per page.
+        allowed_types: Content types that are read; others are skipped.
 
     Returns:
-        A list of dictionaries, each with 'url' and 'html_content' keys.
+        A list of page dictionaries as returned by fetch_page (each with 'url' and
+        'html_content' keys plus metadata), in input order.
     """
-    async with aiohttp.ClientSession() as session:
-        tasks = [fetch_page(session, url) for url in urls]
-        results = await asyncio.gather(*tasks)
-
-    scraped_data = [{"url": url, "html_content": content} for url, content in results]
-    return scraped_data
+    results = [None] * len(urls)
+    with tracer.span("scrape", urls=len(urls), max_concurrent=max_concurrent, per_host=per_host):
+        async for index, item in _scrape_indexed(urls, max_concurrent, per_host,
+                                                 max_bytes=max_bytes, allowed_types=allowed_types):
+            results[index] = item
+    return results
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python web_scraper.py <url1> [url2] [url3] ...")
-        sys.exit(1)
-
-    urls = sys.argv[1:]
-    max_concurrent = 3  # Default concurrency
-    for arg in sys.argv:
-        if arg.startswith("--max-concurrent="):
-            try:
-                max_concurrent = int(arg.split("=")[1])
-            except ValueError:
-                print("Invalid value for --max-concurrent. Using default (3).", file=sys.stderr)
-    
+    parser = argparse.ArgumentParser(description="Fetch web pages concurrently")
+    parser.add_argument("urls", nargs="+", help="URLs to scrape")
+    parser.add_argument("--max-concurrent", type=int, default=3, help="Maximum requests in flight (default: 3)")
+    parser.add_argument("--per-host", type=int, default=2, help="Maximum requests in flight per host (default: 2)")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="Maximum body bytes read per page")
+    args = parser.parse_args()
+
     async def main():
-        result = await scrape_urls(urls)
-        for item in result:
+        async for item in iter_scrape(args.urls, args.max_concurrent, args.per_host, max_bytes=args.max_bytes):
             print(f"Content from {item['url']}:")
             print(item['html_content'][:500] + "...")  # Print first 500 chars
             print("-" * 20)
 
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main())
@@ -1,100 +1,540 @@
+import argparse
+import hashlib
+import json
 import os
 import pathlib
+import random
+import re
+import time
 
-def create_context_files(base_dir: str, output_dir: str, max_depth: int = 2, whitelist: list = None, blacklist: list = None):
+# Directories never worth walking into; hidden directories are skipped as well
+SKIP_DIRS = {'.venv', '__pycache__', '.git', 'context', 'blog_automation.egg-info'}
+# Name endings that only directories have; blacklist patterns ending in one prune them
+DIRECTORY_SUFFIXES = (".egg-info",)
+
+# Incremental state, kept inside the output directory
+CACHE_DIR_NAME = ".context_cache"
+INDEX_VERSION = 2
+
+# Files larger than this are skipped without being read
+DEFAULT_MAX_FILE_BYTES = 1_000_000
+# Bytes read to decide whether a file is binary (contains a NUL byte)
+SNIFF_BYTES = 8192
+# Rough size of a model token, used to turn a token budget into a byte budget
+BYTES_PER_TOKEN = 4
+
+MANIFEST_NAME = "manifest.json"
+CHUNK_NAME = re.compile(r"^context(-\d{3})?\.md$")
+
+
+def iter_files(base_path: pathlib.Path, max_depth: int, skip_dirs=SKIP_DIRS, exclude=(), prune_dir=None,
+               strict_depth: bool = False):
     """
-    Generates a single context file containing contents of all files up to a specified depth,
-    respecting whitelist and blacklist patterns.
+    Walks the tree once with os.scandir, pruning skipped directories before descending
+    into them, and yields every selected file exactly once.
+
+    By default the selection is the historical one: files inside the top-level
+    directories of base_path at any depth below them (files directly in base_path are
+    not listed; nothing is listed when max_depth < 1). Hidden top-level directories
+    are skipped. With strict_depth, max_depth bounds the walk instead: files directly
+    in base_path are at level 0 and are listed, files in base_path/a/b are at level 2,
+    and deeper files and hidden directories at any level are left out.
+
+    Args:
+        base_path: Root of the walk (depth 0).
+        max_depth: See above.
+        skip_dirs: Directory names never entered.
+        exclude: Absolute directory paths never entered (e.g. the output directory).
+        prune_dir: Optional predicate on a directory path; directories it accepts are not entered.
+        strict_depth: Use max_depth as a hard depth limit (see above).
+
+    Yields:
+        os.DirEntry objects of regular files, in sorted (depth-first) order.
+    """
+    exclude = {os.path.abspath(path) for path in exclude}
+    if not strict_depth and max_depth < 1:
+        return
+    stack = [(str(base_path), 0)]
+    while stack:
+        directory, depth = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"  Error listing directory {directory}: {e}")
+            continue
+
+        if strict_depth:
+            descend, skip_hidden, list_files = depth < max_depth, True, True
+        else:
+            descend, skip_hidden, list_files = True, depth == 0, depth > 0
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if (descend and entry.name not in skip_dirs
+                        and not (skip_hidden and entry.name.startswith('.'))
+                        and os.path.abspath(entry.path) not in exclude
+                        and not (prune_dir and prune_dir(_posix(entry.path)))):
+                    subdirs.append((entry.path, depth + 1))
+            elif list_files and entry.is_file():
+                yield entry
+        # Reversed so the stack pops directories in sorted order
+        stack.extend(reversed(subdirs))
+
+
+def _posix(path: str) -> str:
+    return path if os.sep == "/" else path.replace(os.sep, "/")
+
+
+def _translate_part(part: str) -> str:
+    """Regex for one path component of a glob, as fnmatch would match it."""
+    i, n, out = 0, len(part), []
+    while i < n:
+        c = part[i]
+        i += 1
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i
+            if j < n and part[j] in "!]":
+                j += 1
+            while j < n and part[j] != "]":
+                j += 1
+            if j >= n:
+                out.append("\\[")
+                continue
+            body = part[i:j].replace("\\", "\\\\")
+            i = j + 1
+            if body.startswith("!"):
+                out.append(f"[^/{body[1:]}]")
+            elif body.startswith("^"):
+                out.append(f"[\\{body}]")
+            else:
+                out.append(f"[{body}]")
+        else:
+            out.append(re.escape(c))
+    return "".join(out)
+
+
+def _translate(pattern: str) -> str:
+    """
+    Regex emulating PurePath.match: a relative pattern matches the trailing components of a
+    path, an absolute one the whole path.
+    """
+    path = pathlib.PurePath(pattern)
+    if not path.parts:
+        raise ValueError("empty pattern")
+    parts = [_translate_part(part) for part in path.parts if part != path.anchor]
+    body = "/".join(parts)
+    if path.anchor:
+        return f"^{re.escape(_posix(path.anchor))}{body}$"
+    return f"(?:^|/){body}$"
+
+
+class PathMatcher:
+    def __init__(self, patterns):
+        """
+        A set of glob patterns compiled once, with the semantics of `PurePath.match` applied
+        to each pattern. Patterns of the form "*.ext" are answered by a suffix check, the
+        others by one combined regex.
+
+        Args:
+            patterns: Glob patterns (strings or paths).
+        """
+        self.patterns = [str(pattern) for pattern in patterns or ()]
+        # PurePath.match is case-insensitive on Windows
+        self._casefold = os.name == "nt"
+        suffixes, regexes = [], []
+        for pattern in self.patterns:
+            if self._casefold:
+                pattern = pattern.lower()
+            if pattern.startswith("*") and "/" not in pattern and not any(c in pattern[1:] for c in "*?["):
+                suffixes.append(pattern[1:])
+            else:
+                regexes.append(_translate(pattern))
+        self._suffixes = tuple(suffixes)
+        self._regex = re.compile("|".join(f"(?:{regex})" for regex in regexes)) if regexes else None
+
+    def __bool__(self):
+        return bool(self.patterns)
+
+    def __call__(self, path: str) -> bool:
+        """Whether a '/'-separated path matches any of the patterns."""
+        if self._casefold:
+            path = path.lower()
+        if self._suffixes and path.endswith(self._suffixes):
+            return True
+        return self._regex is not None and self._regex.search(path) is not None
+
+    @classmethod
+    def for_directories(cls, patterns) -> "PathMatcher":
+        """
+        Matcher telling which directories a blacklist excludes as a whole. Only patterns
+        that clearly name directories prune anything: those ending in "/" (e.g. "build/"),
+        those ending in "/*" (e.g. "*/venv/*" prunes every "venv" directory) and names
+        with a directory-only suffix such as ".egg-info". Everything below a pruned
+        directory is left out, also files nested deeper than the pattern itself would
+        match. Other patterns (e.g. "test_*" or "*.log") only filter files, so a
+        "test_utils/" package is still walked.
+        """
+        directory_patterns = []
+        for pattern in patterns or ():
+            pattern = str(pattern)
+            if pattern.endswith(("/", os.sep)):
+                directory_patterns.append(pattern.rstrip("/" + os.sep) or pattern)
+                continue
+            parts = pathlib.PurePath(pattern).parts
+            if len(parts) > 1 and parts[-1] == "*":
+                directory_patterns.append(str(pathlib.PurePath(*parts[:-1])))
+            elif parts and parts[-1].endswith(DIRECTORY_SUFFIXES):
+                directory_patterns.append(pattern)
+        return cls(directory_patterns)
+
+
+def _render_section(file_path: str, relative: str, size: int, max_file_bytes: int = None):
+    """
+    Reads a file into a Markdown section, sniffing for binary content first.
+
+    Returns:
+        (section_text, content_hash, skip_reason); section_text is None for skipped files.
+    """
+    if max_file_bytes and size > max_file_bytes:
+        return None, None, f"larger than {max_file_bytes} bytes ({size})"
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+            if b"\0" in head:
+                return None, None, "binary"
+            raw = head + f.read()
+        content_hash = hashlib.sha256(raw).hexdigest()
+        file_content = raw.decode("utf-8")
+        # Append file content with Markdown formatting
+        return f"## File: {relative}\n\n```\n{file_content}\n```\n", content_hash, None
+    except Exception as e:
+        print(f"    Error reading file {file_path}: {e}")
+        return f"## File: {relative}\n\nCould not read file content.\n", None, None
+
+
+class ChunkWriter:
+    def __init__(self, output_path: pathlib.Path, max_chunk_bytes: int = None):
+        """
+        Streams sections into context.md, or into context-001.md, context-002.md, ...
+        when a byte budget is set. Sections are never split, so a section larger than
+        the budget gets a chunk of its own.
+
+        Args:
+            output_path: Directory receiving the chunk files.
+            max_chunk_bytes: Budget per chunk file (UTF-8 bytes), or None for a single file.
+        """
+        self.output_path = output_path
+        self.max_chunk_bytes = max_chunk_bytes
+        self.chunks = []
+        self._file = None
+
+    def _open(self):
+        name = "context.md" if not self.max_chunk_bytes else f"context-{len(self.chunks) + 1:03d}.md"
+        self._file = open(self.output_path / name, "wb")
+        self.chunks.append({"file": name, "bytes": 0, "approx_tokens": 0, "files": []})
+
+    def add(self, relative: str, section: bytes):
+        chunk = self.chunks[-1] if self._file else None
+        separator = b"\n" if chunk and chunk["files"] else b""
+        if chunk is None or (
+            self.max_chunk_bytes and chunk["files"]
+            and chunk["bytes"] + len(separator) + len(section) > self.max_chunk_bytes
+        ):
+            self.close()
+            self._open()
+            chunk, separator = self.chunks[-1], b""
+        self._file.write(separator + section)
+        chunk["bytes"] += len(separator) + len(section)
+        chunk["approx_tokens"] = chunk["bytes"] // BYTES_PER_TOKEN
+        chunk["files"].append(relative)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> list:
+        """Closes the last chunk (creating an empty context.md if nothing was added)."""
+        if not self.chunks:
+            self._open()
+        self.close()
+        return self.chunks
+
+
+def _load_index(index_path: pathlib.Path) -> dict:
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+        if index.get("version") == INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "files": {}}
+
+
+def _stat_signature(path: pathlib.Path):
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _outputs_intact(output_path: pathlib.Path, index: dict) -> bool:
+    """Whether the chunk files and manifest recorded in the index are still on disk untouched."""
+    outputs = index.get("outputs")
+    return bool(outputs) and all(_stat_signature(output_path / name) == signature for name, signature in outputs)
+
+
+def create_context_files(base_dir: str, output_dir: str, max_depth: int = 2, whitelist: list = None,
+                         blacklist: list = None, incremental: bool = False, max_chunk_bytes: int = None,
+                         max_chunk_tokens: int = None, max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                         strict_depth: bool = False) -> dict:
+    """
+    Generates context files containing contents of all files up to a specified depth,
+    respecting whitelist and blacklist patterns. Sections are streamed to disk as they are
+    read, into context.md or, with a budget, into numbered chunks context-001.md, ...;
+    manifest.json lists the files of every chunk and the files that were skipped.
 
     Args:
         base_dir: The root directory to start traversing from.
-        output_dir: The directory where the context file will be saved.
-        max_depth: The maximum depth of subdirectories to traverse.
+        output_dir: The directory where the context files will be saved.
+        max_depth: By default, any value of 1 or more selects every file inside the
+            non-hidden top-level directories of base_dir, at any depth; files directly in
+            base_dir are not included, and 0 selects nothing. With strict_depth it is the
+            deepest directory level included: files directly in base_dir are level 0 and
+            are included, deeper files are left out.
         whitelist: A list of patterns to include (takes precedence over blacklist).
         blacklist: A list of patterns to exclude.
+        incremental: Reuse the sections of files whose mtime and size (or content hash)
+            did not change since the last run, from an index kept in
+            output_dir/.context_cache; the outputs are not rewritten if nothing changed.
+        max_chunk_bytes: Size budget of one chunk file in bytes.
+        max_chunk_tokens: Size budget of one chunk file in approximate tokens (used when
+            max_chunk_bytes is not set).
+        max_file_bytes: Files larger than this are skipped without being read (None for no limit).
+            Files with a NUL byte in their first 8 KiB are skipped as binary.
+        strict_depth: Use max_depth as a hard depth limit, as described above.
+
+    Returns:
+        A dictionary with 'files' (sections written), 'skipped', 'rendered' (sections built
+        from file contents), 'reused' (sections taken from the cache), 'chunks' and
+        'written' (whether the outputs were written).
     """
-    base_path = pathlib.Path(base_dir)
+    start = time.perf_counter()
+    base_path = pathlib.Path(os.path.abspath(base_dir))
     output_path = pathlib.Path(output_dir)
+    if not max_chunk_bytes and max_chunk_tokens:
+        max_chunk_bytes = max_chunk_tokens * BYTES_PER_TOKEN
 
     # Create the output directory if it doesn't exist
     output_path.mkdir(parents=True, exist_ok=True)
 
-    # Create a single context file
-    context_file_path = output_path / "context.md"
-
-    # Initialize list to hold all file contents
-    all_file_contents = []
-
-    # Normalize whitelist and blacklist to Path objects for easier comparison
-    if whitelist:
-        whitelist = [pathlib.Path(p) for p in whitelist]
-    if blacklist:
-        blacklist = [pathlib.Path(p) for p in blacklist]
-
-    # Process each depth level
-    for current_depth in range(1, max_depth + 1):
-        print(f"Processing directories at depth: {current_depth}")
-        for dir_path in base_path.glob("*/" * current_depth):
-            if dir_path.is_dir():
-                # Skip hidden directories (those starting with .) at any level
-                dir_relative = dir_path.relative_to(base_path)
-                if any(part.startswith('.') for part in dir_relative.parts):
-                    print(f"  Skipping hidden directory: {dir_path}")
-                    continue
-                
-                print(f"  Processing directory: {dir_path}")
-
-                for file_path in dir_path.rglob("*"):  # rglob for recursive within this dir
-                    if file_path.is_file():
-                        # Added skip check for system directories unlikely to hold key business context files
-                        relative_parts = file_path.relative_to(base_path).parts
-                        if any(part in {'.venv', '__pycache__', '.git', 'context', 'blog_automation.egg-info'} for part in relative_parts):
-                            continue
-
-                        # Whitelist check (takes precedence)
-                        if whitelist:
-                            whitelisted = False
-                            for pattern in whitelist:
-                                if file_path.match(str(pattern)):
-                                    whitelisted = True
-                                    break
-                            if not whitelisted:
-                                continue  # Skip this file
-
-                        # Blacklist check
-                        if blacklist:
-                            blacklisted = False
-                            for pattern in blacklist:
-                                if file_path.match(str(pattern)):
-                                    blacklisted = True
-                                    break
-                            if blacklisted:
-                                continue  # Skip this file
-                        
-                        try:
-                            with open(file_path, "r", encoding="utf-8") as f:
-                                file_content = f.read()
-
-                            # Append file content with Markdown formatting
-                            all_file_contents.append(f"## File: {file_path.relative_to(base_path)}\n\n```\n{file_content}\n```\n")
-
-                        except Exception as e:
-                            print(f"    Error reading file {file_path}: {e}")
-                            all_file_contents.append(f"## File: {file_path.relative_to(base_path)}\n\nCould not read file content.\n")
-
-    # Write all contents to a single context file
-    try:
-        with open(context_file_path, "w", encoding="utf-8") as context_file:
-            context_file.write("\n".join(all_file_contents))
-        print(f"Generated context file: {context_file_path}")
-    except Exception as e:
-        print(f"Error writing context file {context_file_path}: {e}")
+    # Compile whitelist and blacklist once; blacklisted directories are not even entered
+    whitelist = PathMatcher(whitelist)
+    blacklist = PathMatcher(blacklist)
+    prune_dir = PathMatcher.for_directories(blacklist.patterns) or None
+
+    cache_path = output_path / CACHE_DIR_NAME
+    sections_path = cache_path / "sections"
+    index_path = cache_path / "index.json"
+    old_index = _load_index(index_path) if incremental else {"files": {}}
+    if old_index.get("max_file_bytes") != max_file_bytes:
+        # Cached skip decisions depend on the size limit
+        old_index["files"] = {}
+    if incremental:
+        sections_path.mkdir(parents=True, exist_ok=True)
+    new_files = {}
+    pending = []  # incremental: (relative path, cached section file) in output order
+    skipped = []
+    writer = ChunkWriter(output_path, max_chunk_bytes)
+    stats = {"files": 0, "skipped": 0, "rendered": 0, "reused": 0, "chunks": 0, "written": False}
+
+    print(f"Walking {base_path} (max depth {max_depth})")
+    prefix_length = len(_posix(os.path.join(str(base_path), "")))
+    for entry in iter_files(base_path, max_depth, exclude=[output_path], prune_dir=prune_dir,
+                            strict_depth=strict_depth):
+        path = _posix(entry.path)
+
+        # Whitelist check (takes precedence)
+        if whitelist and not whitelist(path):
+            continue
+        # Blacklist check
+        if blacklist and blacklist(path):
+            continue
+
+        file_path = entry.path
+        relative = path[prefix_length:]
+        stat = entry.stat()
+        if not incremental:
+            text, _, reason = _render_section(file_path, relative, stat.st_size, max_file_bytes)
+            stats["rendered"] += 1
+            if reason:
+                skipped.append({"path": relative, "reason": reason})
+            else:
+                writer.add(relative, text.encode("utf-8"))
+            continue
+
+        signature = [stat.st_mtime_ns, stat.st_size]
+        known = old_index["files"].get(relative)
+        if known and known["signature"] == signature and (
+                "skipped" in known or (sections_path / known["section"]).exists()):
+            stats["reused"] += 1
+        else:
+            text, content_hash, reason = _render_section(file_path, relative, stat.st_size, max_file_bytes)
+            if reason:
+                known = {"signature": signature, "skipped": reason}
+            else:
+                section = hashlib.sha256(text.encode("utf-8")).hexdigest() + ".md"
+                if not (sections_path / section).exists():
+                    (sections_path / section).write_text(text, encoding="utf-8")
+                known = {"signature": signature, "hash": content_hash, "section": section}
+            stats["rendered"] += 1
+        new_files[relative] = known
+        if "skipped" in known:
+            skipped.append({"path": relative, "reason": known["skipped"]})
+        else:
+            pending.append((relative, sections_path / known["section"]))
+
+    order = [[relative, section.name] for relative, section in pending]
+    unchanged = (
+        incremental
+        and old_index.get("order") == order
+        and old_index.get("max_chunk_bytes") == max_chunk_bytes
+        and _outputs_intact(output_path, old_index)
+    )
+
+    if unchanged:
+        chunks = old_index["chunks"]
+        outputs = old_index["outputs"]
+        print(f"Context files are up to date in {output_path}")
+    else:
+        for relative, section in pending:
+            writer.add(relative, section.read_bytes())
+        chunks = writer.finish()
+        names = {chunk["file"] for chunk in chunks}
+        for stale in output_path.iterdir():
+            if CHUNK_NAME.match(stale.name) and stale.name not in names:
+                stale.unlink()
+        manifest = {
+            "base_dir": str(base_path),
+            "max_chunk_bytes": max_chunk_bytes,
+            "max_file_bytes": max_file_bytes,
+            "chunks": chunks,
+            "skipped": skipped,
+        }
+        (output_path / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        outputs = [[name, _stat_signature(output_path / name)] for name in sorted(names) + [MANIFEST_NAME]]
+        stats["written"] = True
+        print(f"Generated {len(chunks)} context file(s) in {output_path}")
+    stats["chunks"] = len(chunks)
+    stats["files"] = sum(len(chunk["files"]) for chunk in chunks)
+    stats["skipped"] = len(skipped)
+
+    if incremental:
+        index = {
+            "version": INDEX_VERSION,
+            "max_file_bytes": max_file_bytes,
+            "max_chunk_bytes": max_chunk_bytes,
+            "files": new_files,
+            "order": order,
+            "chunks": chunks,
+            "outputs": outputs,
+        }
+        tmp_path = index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(index), encoding="utf-8")
+        tmp_path.replace(index_path)
+        # Drop sections no file refers to anymore
+        live = {section.name for _, section in pending}
+        for section_file in sections_path.iterdir():
+            if section_file.name not in live:
+                section_file.unlink()
+
+    print(
+        f"{stats['files']} files in {stats['chunks']} chunk(s), {stats['skipped']} skipped: "
+        f"{stats['rendered']} rendered, {stats['reused']} reused in {time.perf_counter() - start:.2f}s"
+    )
+    return stats
+
+
+def benchmark_matching(whitelist: list, blacklist: list, count: int = 100_000, seed: int = 0) -> dict:
+    """
+    Microbenchmark of the whitelist/blacklist filter over `count` synthetic paths: the
+    previous per-pattern `Path.match` loop against the compiled PathMatcher. Both must
+    take the same decision for every path.
+
+    Returns:
+        A dictionary with 'files', 'legacy_files_per_sec', 'compiled_files_per_sec',
+        'speedup' and 'mismatches'.
+    """
+    rng = random.Random(seed)
+    directories = ["src", "tools", "utils", "docs", "venv", "lib", "__pycache__", "context", "pkg", "tests"]
+    extensions = [".py", ".md", ".txt", ".json", ".pyc", ".yaml", ""]
+    paths = []
+    for i in range(count):
+        parts = [rng.choice(directories) for _ in range(rng.randint(0, 4))]
+        paths.append("/".join(["/repo"] + parts + [f"file{i}{rng.choice(extensions)}"]))
+
+    def legacy(path):
+        file_path = pathlib.Path(path)
+        if whitelist and not any(file_path.match(str(pattern)) for pattern in map(pathlib.Path, whitelist)):
+            return False
+        return not (blacklist and any(file_path.match(str(pattern)) for pattern in map(pathlib.Path, blacklist)))
+
+    include, exclude = PathMatcher(whitelist), PathMatcher(blacklist)
+
+    def compiled(path):
+        if include and not include(path):
+            return False
+        return not (exclude and exclude(path))
+
+    timings, decisions = {}, {}
+    for name, accept in (("legacy", legacy), ("compiled", compiled)):
+        start = time.perf_counter()
+        decisions[name] = [accept(path) for path in paths]
+        timings[name] = time.perf_counter() - start
+    result = {
+        "files": count,
+        "legacy_files_per_sec": round(count / timings["legacy"]),
+        "compiled_files_per_sec": round(count / timings["compiled"]),
+        "speedup": round(timings["legacy"] / timings["compiled"], 1),
+        "mismatches": sum(a != b for a, b in zip(decisions["legacy"], decisions["compiled"])),
+    }
+    print(
+        f"{count} paths: Path.match {result['legacy_files_per_sec']:,} files/s, "
+        f"compiled {result['compiled_files_per_sec']:,} files/s ({result['speedup']}x), "
+        f"{result['mismatches']} mismatches"
+    )
+    return result
 
 
 if __name__ == "__main__":
     base_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Go up two levels
     context_directory = os.path.join(base_directory, "context")
 
+    parser = argparse.ArgumentParser(description="Collect project files into context/context.md (or numbered chunks)")
+    parser.add_argument("--max-depth", type=int, default=2,
+                        help="Without --strict-depth, 0 selects nothing and any other value every file below "
+                             "the top-level directories (root files excluded); with it, the deepest directory "
+                             "level included (root is 0)")
+    parser.add_argument("--strict-depth", action="store_true",
+                        help="Treat --max-depth as a hard limit: include files directly in the root and leave "
+                             "out files deeper than --max-depth levels")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-read files changed since the last run (index in context/.context_cache)")
+    budget = parser.add_mutually_exclusive_group()
+    budget.add_argument("--max-chunk-bytes", type=int, help="Split the output into chunks of at most this many bytes")
+    budget.add_argument("--max-chunk-tokens", type=int, help="Split the output into chunks of about this many tokens")
+    parser.add_argument("--max-file-bytes", type=int, default=DEFAULT_MAX_FILE_BYTES,
+                        help="Skip files larger than this (default: %(default)s)")
+    parser.add_argument("--benchmark", type=int, nargs="?", const=100_000, metavar="FILES",
+                        help="Only time the whitelist/blacklist filter on FILES synthetic paths (default 100000)")
+    args = parser.parse_args()
+
     print(f"Base directory: {base_directory}")
     print(f"Output context directory: {context_directory}")
 
@@ -109,4 +549,11 @@ if __name__ == "__main__":
         "*/context/*"
     ] # Exclude venv, __pycache__, .git, and context directories
 
-    create_context_files(base_directory, context_directory, whitelist=whitelist, blacklist=blacklist)
+    if args.benchmark:
+        benchmark_matching(whitelist, blacklist, count=args.benchmark)
+        raise SystemExit(0)
+
+    create_context_files(base_directory, context_directory, max_depth=args.max_depth, whitelist=whitelist,
+                         blacklist=blacklist, incremental=args.incremental, max_chunk_bytes=args.max_chunk_bytes,
+                         max_chunk_tokens=args.max_chunk_tokens, max_file_bytes=args.max_file_bytes,
+                         strict_depth=args.strict_depth)